@@ -3,22 +3,23 @@ from app.models.dinner import  Dinner, DinnerGroup
 from app.schemas.dinner import CreateDinnerRequest, CreateDinnerResponse
 from typing import List, Optional
 from app.schemas.response import SuccessResponse
-from app.services.matchmaking.v1 import run_matchmaking_for_dinner, calculate_group_score, group_users_by_preferences
-from app.models.user import User
+from app.services.matchmaking.engines import MATCHMAKING_SOLVERS, DEFAULT_ENGINE
+from app.services.matchmaking.jobs import preview_dinner_matching, submit_match_job
+from app.models.match_job import MatchJob
+from app.models.match_run import MatchRun
 from app.utils.send_dinner_match_email import send_dinner_match_email
 from app.dependencies.admin import get_current_admin_user
 from pydantic import EmailStr, BaseModel
 from app.models.admin import AdminUser
-from app.utils.hashing import verify_password
+from app.utils.hashing import verify_password_async
 from app.services.session import create_or_update_session
 from app.models.venue import Venue
 router = APIRouter(prefix="/admin", tags=["Admin"])
-from app.schemas.venue import CreateVenueRequest, VenueResponse
+from app.schemas.venue import CreateVenueRequest, VenueAssignmentResponse, VenueResponse
+from app.services.venue_assignment import assign_venues, notify_venue_assignment
 from beanie import PydanticObjectId
 import asyncio
-import pprint
 from app.core.logger import logger
-from app.core.notifications.producer import queue_notification
 class AdminLoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -29,9 +30,15 @@ class UpdateVenueRequest(BaseModel):
     city: Optional[str]
     country: Optional[str]
     is_active: Optional[bool]
+    capacity: Optional[int] = None
+    max_group_size: Optional[int] = None
+    budget_tiers: Optional[List[str]] = None
 
 class UpdateVenueRequestForDinner(BaseModel):
     venue_id: str
+class MatchJobSubmitted(BaseModel):
+    job_id: str
+    status: str
 class TokenPair(BaseModel):
     access_token: str
     refresh_token: str
@@ -41,7 +48,7 @@ async def admin_login(payload: AdminLoginRequest,  request: Request):
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
 
-    if not verify_password(payload.password, admin.password_hash):
+    if not await verify_password_async(payload.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
    
@@ -102,104 +109,76 @@ async def update_dinner_group_venue(
     if not venue or not venue.is_active:
         raise HTTPException(status_code=400, detail="Invalid or inactive venue ID")
 
-    group.venue_id = payload.venue_id
+    group.venue_id = venue.id
     await group.save()
 
     # 📬 Notify all participants in the group
-    for user_id in group.participant_ids:
-        user = await User.get(user_id)
-        if not user:
-            continue
-        queue_notification({
-        "type": "VENUE_UPDATE",
-        "to_email": user.email,
-        "name": user.name or "there",
-        "venue_name": venue.name,
-        "venue_address": venue.address,
-        "city": venue.city,
-        "date": group.date.strftime("%A, %d %B %Y") if hasattr(group, "date") else "your dinner date"
-    })
+    dinner = await Dinner.get(group.dinner_id)
+    if dinner:
+        await notify_venue_assignment(dinner, [group], {venue.id: venue})
 
     return SuccessResponse(message="Venue updated successfully and users notified", data=group)
 
 
-    return SuccessResponse(message="Venue updated successfully", data=group)
-@router.post("/run-matching", dependencies=[Depends(get_current_admin_user)])
-async def run_matching(dinner_id: PydanticObjectId):
-    dinner = await Dinner.get(dinner_id)
+@router.post(
+    "/dinner/{dinner_id}/assign-venues",
+    response_model=SuccessResponse[VenueAssignmentResponse],
+    dependencies=[Depends(get_current_admin_user)]
+)
+async def assign_dinner_venues(dinner_id: PydanticObjectId, notify: bool = True):
+    """Assign a venue to every group of the dinner that has none, in one pass."""
+    result = await assign_venues(dinner_id, notify=notify)
+    return SuccessResponse(message="Venues assigned", data=result)
 
-    if not dinner or dinner.matched:
-        raise HTTPException(status_code=404, detail="Dinner not found or already matched")
-
-    user_map = {}
-    for opt_in in dinner.opted_in_users:
-        user = await User.get(opt_in.user_id)
-        if user and user.personality_answers and user.personality_scores:
-            user_map[user.id] = {
-                "user": user,
-                "budget_category": opt_in.budget_category,
-                "dietary_category": opt_in.dietary_category
-            }
-
-    if len(user_map) < 6:
-        return {
-            "message": "Insufficient users",
-            "summary": {
-                "dinner_id": str(dinner.id),
-                "status": "skipped",
-                "reason": f"Only {len(user_map)} valid users"
-            }
-        }
-
-    users = [entry["user"] for entry in user_map.values()]
-
-    preference_groups = group_users_by_preferences(user_map)
-    logger.info("Preference groups:\n%s", pprint.pformat(preference_groups))
-
-
-    matched_groups = []
-    for (budget, dietary), user_list in preference_groups.items():
-        if len(user_list) < 6:
-            continue  # Not enough users for a group
-        new_groups = await run_matchmaking_for_dinner(user_list)
-        matched_groups.extend(new_groups)  # accumulate all matched groups
-        for group in new_groups:
-            match_score = calculate_group_score(group)
-
-            dinner_group = DinnerGroup(
-                dinner_id=dinner.id,
-                participant_ids=[u.id for u in group],
-                venue_id=None,
-                budget_category=budget,
-                dietary_category=dietary,
-                match_score=match_score
-            )
-            await dinner_group.insert()
-
-            # # Notify users
-            # for user in group:
-            #     queue_notification({
-            #     "type":"DINNER_UPDATE",
-            #     "to_email":user.email,
-            #     "name":user.name or "there",
-            #     "date":dinner.date.strftime("%A, %d %B %Y"),
-            #     "time":dinner.date.strftime("%I:%M %p"),
-            #     "city":dinner.city
-            #     })
-                
-
-
-    dinner.matched = True
-    await dinner.save()
-
-    return SuccessResponse(message= "Matching complete",data={
-            "summary": {
-                "dinner_id": str(dinner.id),
-                "groups_created": len(matched_groups),
-                "ungrouped_users": len(users) % 6,
-                "status": "matched"
-            }
-    })
+
+
+@router.post("/run-matching", response_model=SuccessResponse[MatchJobSubmitted], dependencies=[Depends(get_current_admin_user)])
+async def run_matching(
+    dinner_id: PydanticObjectId,
+    engine: str = DEFAULT_ENGINE,
+    seed: Optional[int] = None,
+    min_group_size: Optional[int] = None,
+    max_group_size: Optional[int] = None,
+):
+    if engine not in MATCHMAKING_SOLVERS:
+        raise HTTPException(status_code=400, detail=f"Unknown matchmaking engine '{engine}'")
+
+    job = await submit_match_job(
+        dinner_id, engine=engine, seed=seed, min_group_size=min_group_size, max_group_size=max_group_size
+    )
+    return SuccessResponse(message="Matching job submitted", data=MatchJobSubmitted(job_id=str(job.id), status=job.status))
+
+
+@router.post("/preview-matching", response_model=SuccessResponse[dict], dependencies=[Depends(get_current_admin_user)])
+async def preview_matching(
+    dinner_id: PydanticObjectId,
+    engine: str = DEFAULT_ENGINE,
+    seed: Optional[int] = None,
+    min_group_size: Optional[int] = None,
+    max_group_size: Optional[int] = None,
+):
+    """Dry run of run-matching: the groups' score distribution and who would be left out, nothing persisted."""
+    if engine not in MATCHMAKING_SOLVERS:
+        raise HTTPException(status_code=400, detail=f"Unknown matchmaking engine '{engine}'")
+
+    preview = await preview_dinner_matching(
+        dinner_id, engine=engine, seed=seed, min_group_size=min_group_size, max_group_size=max_group_size
+    )
+    return SuccessResponse(message="Matching preview computed", data=preview)
+
+
+@router.get("/match-jobs/{job_id}", response_model=SuccessResponse[MatchJob], dependencies=[Depends(get_current_admin_user)])
+async def get_match_job(job_id: PydanticObjectId):
+    job = await MatchJob.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Matching job not found")
+    return SuccessResponse(message="Matching job fetched", data=job)
+
+@router.get("/match-runs", response_model=SuccessResponse[List[MatchRun]], dependencies=[Depends(get_current_admin_user)])
+async def list_match_runs(dinner_id: Optional[PydanticObjectId] = None, limit: int = 50):
+    query = MatchRun.find(MatchRun.dinner_id == dinner_id) if dinner_id else MatchRun.find_all()
+    runs = await query.sort(-MatchRun.created_at).limit(min(limit, 500)).to_list()
+    return SuccessResponse(message="Matching runs fetched", data=runs)
 
 @router.post("/venues", response_model=SuccessResponse[VenueResponse], dependencies=[Depends(get_current_admin_user)])
 async def create_venue(payload: CreateVenueRequest):
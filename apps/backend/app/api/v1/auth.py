@@ -54,7 +54,7 @@ async def refresh_token(
     payload = decode_token(token, expected_type="refresh")
 
     session = await Session.find_one(Session.refresh_token == token)
-    if not session:
+    if not session or not session.is_active:
         raise HTTPException(status_code=401, detail="Session not found or expired")
 
     updated_session = await create_or_update_session(
@@ -1,6 +1,6 @@
 # dinner_routes_user.py
 from fastapi import APIRouter, Depends, HTTPException
-from beanie.operators import In
+from beanie.operators import In, Push
 from typing import List, Optional
 from datetime import date
 from beanie import PydanticObjectId
@@ -13,10 +13,13 @@ from pydantic import BaseModel
 from bson import ObjectId
 from app.utils.require_active_subscription import require_active_subscription
 from app.core.notifications.producer import queue_notification
+from app.core.logger import logger
+from app.services.matchmaking.incremental import record_opt_in, slot_late_opt_in
 from zoneinfo import ZoneInfo  # Python 3.9+
 
 class OptInResponse(BaseModel):
     dinner_id: PydanticObjectId
+    group_id: Optional[PydanticObjectId] = None  # set when a late opt-in was seated in a matched group
 class OptInRequest(BaseModel):
     dinner_id: PydanticObjectId
     budget_category: Optional[str] = None
@@ -60,16 +63,32 @@ async def opt_in_to_dinner(
     if not dinner:
         raise HTTPException(status_code=404, detail="Dinner not found")
 
-    if any(u.user_id == user.id for u in dinner.opted_in_users):
-        raise HTTPException(status_code=400, detail="Already opted in")
-
-    dinner.opted_in_users.append(DinnerOptInUser(
+    opt_in = DinnerOptInUser(
         user_id=user.id,
         budget_category=payload.budget_category,
         dietary_category=payload.dietary_category
-    ))
+    )
+    # Push only the opt-in: saving the whole dinner would write back a stale matched flag
+    # and undo a matching run that committed since we read it
+    result = await Dinner.find_one(
+        Dinner.id == dinner.id, {"opted_in_users.user_id": {"$ne": user.id}}
+    ).update(Push({Dinner.opted_in_users: opt_in}))
+    if result.modified_count != 1:
+        raise HTTPException(status_code=400, detail="Already opted in")
+
+    # Re-read after the push, so a run that matched the dinner meanwhile sends us to the late path
+    dinner = await Dinner.get(dinner.id)
+
+    # Matching state is an optimisation: the opt-in itself is saved, so don't fail the request over it
+    group = None
+    try:
+        if dinner.matched:
+            group = await slot_late_opt_in(dinner, opt_in, user)
+        else:
+            await record_opt_in(dinner, opt_in, user)
+    except Exception:
+        logger.exception("Could not update matching state for dinner %s", dinner.id)
 
-    await dinner.save()
     utc_dt = dinner.date
 
     ist_dt = utc_dt.astimezone(ZoneInfo("Asia/Kolkata"))
@@ -85,7 +104,7 @@ async def opt_in_to_dinner(
 
     return SuccessResponse(
         message="Opted-in successfully",
-        data=OptInResponse(dinner_id=payload.dinner_id)
+        data=OptInResponse(dinner_id=payload.dinner_id, group_id=group.id if group else None)
     )
 
 
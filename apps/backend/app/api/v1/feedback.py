@@ -1,7 +1,47 @@
-from fastapi import APIRouter
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from pymongo import ReturnDocument
+
+from app.dependencies.auth import get_current_user
+from app.models.dinner import Dinner, DinnerGroup
+from app.models.feedback import Feedback
+from app.models.user import User
+from app.schemas.feedback import FeedbackResponse, SubmitFeedbackRequest
+from app.schemas.response import SuccessResponse
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
-@router.post("/")
-async def submit_feedback():
-    return {"message": "Feedback received"}
+@router.post("/", response_model=SuccessResponse[FeedbackResponse])
+async def submit_feedback(payload: SubmitFeedbackRequest, user: User = Depends(get_current_user)):
+    group = await DinnerGroup.get(payload.dinner_group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Dinner group not found")
+    if user.id not in group.participant_ids:
+        raise HTTPException(status_code=403, detail="You were not part of this dinner group")
+
+    dinner = await Dinner.get(group.dinner_id)
+    if dinner and dinner.date.replace(tzinfo=dinner.date.tzinfo or timezone.utc) > datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail="Feedback opens once the dinner has taken place")
+
+    # One rating per user and group: resubmitting replaces the earlier one. A single upsert,
+    # so a double submit can't race into the unique index
+    feedback = await Feedback.get_motor_collection().find_one_and_update(
+        {"user_id": user.id, "dinner_group_id": group.id},
+        {
+            "$set": {
+                "rating": payload.rating,
+                "comments": payload.comments,
+                "submitted_at": datetime.now(timezone.utc),
+            },
+            "$setOnInsert": {"dinner_id": group.dinner_id},
+        },
+        projection={"_id": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    return SuccessResponse(
+        message="Feedback received",
+        data=FeedbackResponse(feedback_id=feedback["_id"], dinner_group_id=group.id, rating=payload.rating),
+    )
@@ -4,6 +4,8 @@ from app.services.matchmaking.v1 import compute_personality_scores
 from app.schemas.response import SuccessResponse
 from app.dependencies.auth import get_current_user  # middleware-based email extraction
 from app.models.user import User, PersonalityAnswer
+from app.core.auth_cache import auth_cache
+from beanie.operators import Set
 
 router = APIRouter(prefix="/journey", tags=["Journey"])
 @router.post(
@@ -65,10 +67,12 @@ async def save_journey(
     key = payload.question_key
     val = payload.answer
 
+    # Only the answered field is written: saving the whole user would put back fields another
+    # request changed meanwhile, like a subscription status set by a Stripe webhook
     if key == "current_country":
-        user.current_country = val
+        changes = {User.current_country: val}
     elif key == "current_city":
-        user.current_city = val
+        changes = {User.current_city: val}
     elif key.startswith("q") and key[1:].isdigit():
         index = int(key[1:])
         if 0 <= index < 15:
@@ -77,30 +81,34 @@ async def save_journey(
                         "O", "C", "E", "A", "N",
                         "O", "C", "E", "A", "N"]
             trait = trait_map[index]
+            answer = PersonalityAnswer(
+                trait=trait,
+                question=payload.question or "",
+                answer=val
+            )
 
             # Ensure valid list
             if not user.personality_answers or len(user.personality_answers) < 15:
-                user.personality_answers = [
+                answers = [
                     PersonalityAnswer(trait=trait_map[i], question="", answer="") for i in range(15)
                 ]
-
-            user.personality_answers[index] = PersonalityAnswer(
-                trait=trait,
-                question=payload.question or "",
-                answer=val
-            )
+                answers[index] = answer
+                changes = {User.personality_answers: answers}
+            else:
+                changes = {f"personality_answers.{index}": answer}
         else:
             raise HTTPException(status_code=400, detail="Invalid question index")
     elif key in {"gender", "relationship_status", "profession", "country", "name", "mobile"}:
-        setattr(user, key, val)
+        changes = {key.value: val}
     elif key == "children":
-        user.children = bool(val)
+        changes = {User.children: bool(val)}
     elif key == "dob":
-        user.dob = val
+        changes = {User.dob: val}
     else:
         raise HTTPException(status_code=400, detail="Unknown question_key")
 
-    await user.save()
+    await User.find_one(User.id == user.id).update(Set(changes))
+    auth_cache.invalidate_email(user.email)
     return SuccessResponse(message="Answer saved", data={})
 
 
@@ -116,8 +124,8 @@ async def submit_journey(user: User = Depends(get_current_user)):
 
 
     scores = compute_personality_scores(user.personality_answers)
-    user.personality_scores = scores
-    await user.save()
+    await User.find_one(User.id == user.id).update(Set({User.personality_scores: scores}))
+    auth_cache.invalidate_email(user.email)
 
     return SuccessResponse(
         message="Journey submitted successfully",
@@ -9,7 +9,9 @@ from app.core.config import settings
 from datetime import datetime, timezone
 from pydantic import BaseModel
 from app.core.notifications.producer import queue_notification
+from app.core.auth_cache import auth_cache
 from beanie import PydanticObjectId
+from beanie.operators import Set
 router = APIRouter(prefix="/subscription", tags=["Subscription"])
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
@@ -78,9 +80,12 @@ async def cancel_subscription(user: User = Depends(get_current_user)):
     subscription.end_date = datetime.now(timezone.utc)
     await subscription.save()
 
-    user.subscription_status = "cancelled"
-    user.subscription_end_date = subscription.end_date
-    await user.save()
+    # Just the subscription fields: `user` comes from the auth cache and may be behind the database
+    await User.find_one(User.id == user.id).update(Set({
+        User.subscription_status: "cancelled",
+        User.subscription_end_date: subscription.end_date,
+    }))
+    auth_cache.invalidate_email(user.email)
     
     return {"message": "Subscription cancelled"}
 
@@ -107,10 +112,12 @@ async def stripe_webhook(request: Request):
 
         user = await User.get(PydanticObjectId(user_id))
         if user:
-            user.stripe_customer_id = customer_id
-            user.subscription_status = "active"
-            user.subscription_end_date = datetime.fromtimestamp(subscription['current_period_end'], tz=timezone.utc)
-            await user.save()
+            await User.find_one(User.id == user.id).update(Set({
+                User.stripe_customer_id: customer_id,
+                User.subscription_status: "active",
+                User.subscription_end_date: datetime.fromtimestamp(subscription['current_period_end'], tz=timezone.utc),
+            }))
+            auth_cache.invalidate_email(user.email)
 
         new_sub = Subscription(
             user_email=customer_email,
@@ -138,8 +145,8 @@ async def stripe_webhook(request: Request):
 
                 user = await User.find_one(User.email == subscription.user_email)
                 if user:
-                    user.subscription_status = "payment_failed"
-                    await user.save()
+                    await User.find_one(User.id == user.id).update(Set({User.subscription_status: "payment_failed"}))
+                    auth_cache.invalidate_email(user.email)
 
                 queue_notification({
                     "type": "SUBSCRIPTION_EMAIL",
@@ -158,9 +165,11 @@ async def stripe_webhook(request: Request):
 
             user = await User.find_one(User.email == subscription.user_email)
             if user:
-                user.subscription_status = "cancelled"
-                user.subscription_end_date = subscription.end_date
-                await user.save()
+                await User.find_one(User.id == user.id).update(Set({
+                    User.subscription_status: "cancelled",
+                    User.subscription_end_date: subscription.end_date,
+                }))
+                auth_cache.invalidate_email(user.email)
 
             queue_notification({
                 "type": "SUBSCRIPTION_EMAIL",
@@ -0,0 +1,112 @@
+# app/core/auth_cache.py
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+PRINCIPAL_KINDS = ("user", "admin")  # same values as Session.type
+
+
+def token_key(token: str) -> str:
+    """Cache key for a bearer token; raw tokens are never kept in memory longer than the request."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _detached(principal: BaseModel) -> BaseModel:
+    # A deep copy would dominate a warm lookup; handlers only reassign fields or items of
+    # top-level lists/dicts, so copying those containers is enough
+    copy = principal.model_copy()
+    for name, value in principal.__dict__.items():
+        if isinstance(value, (list, dict)):
+            copy.__dict__[name] = value.copy()
+    return copy
+
+
+class AuthCache:
+    """
+    In-process TTL + LRU cache of authenticated principals (User or AdminUser) per access
+    token, so warm requests skip the JWT decode and both Mongo lookups. Entries expire
+    after AUTH_CACHE_TTL_SECONDS or when their token does, whichever is first, and are
+    dropped at once on logout, token refresh and changes to the user. Lookups return a
+    copy, so handlers can modify what they get, but it may be behind the database:
+    handlers $set the fields they change instead of saving it. Each process keeps its
+    own cache; the TTL bounds how stale another worker can be, and revocations loaded by
+    app.core.revocations drop the entries of revoked tokens sooner.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str, Optional[str], BaseModel]]" = OrderedDict()
+        self._by_email: Dict[str, Set[Tuple[str, str]]] = {}
+        self._by_jti: Dict[str, Set[Tuple[str, str]]] = {}
+
+    def get(self, kind: str, token: str) -> Optional[BaseModel]:
+        key = (kind, token_key(token))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, _, principal = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return _detached(principal)
+
+    def put(
+        self, kind: str, token: str, email: str, principal: BaseModel,
+        token_expires_at: Optional[float] = None, jti: Optional[str] = None,
+    ):
+        """Cache `principal` for `token`; `token_expires_at` and `jti` are the JWT's exp (epoch seconds) and jti claims."""
+        if self.ttl <= 0:
+            return
+        lifetime = self.ttl
+        if token_expires_at is not None:
+            lifetime = min(lifetime, token_expires_at - time.time())
+        if lifetime <= 0:
+            return
+        key = (kind, token_key(token))
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + lifetime, email, jti, principal.model_copy(deep=True))
+        self._by_email.setdefault(email, set()).add(key)
+        if jti:
+            self._by_jti.setdefault(jti, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_token(self, token: str):
+        digest = token_key(token)
+        for kind in PRINCIPAL_KINDS:
+            self._drop((kind, digest))
+
+    def invalidate_email(self, email: str):
+        for key in list(self._by_email.get(email, ())):
+            self._drop(key)
+
+    def invalidate_jti(self, jti: str):
+        for key in list(self._by_jti.get(jti, ())):
+            self._drop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_email.clear()
+        self._by_jti.clear()
+
+    def _drop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, email, jti, _ = entry
+        for index, value in ((self._by_email, email), (self._by_jti, jti)):
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+
+
+auth_cache = AuthCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
@@ -12,6 +12,10 @@ class Settings(BaseSettings):
     EMAIL_PASSWORD: str
     SMTP_SERVER: str
     SMTP_PORT: int  # ✅ Add this
+    SMTP_STARTTLS: bool = True
+    SMTP_POOL_SIZE: int = 4  # open SMTP connections per process
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # then log out and reconnect; servers limit emails per session
+    SMTP_IDLE_CHECK_SECONDS: float = 30  # connections idle longer than this get a NOOP before reuse
     STRIPE_SECRET_KEY: str
     SQS_QUEUE_URL: str
     AWS_ACCESS_KEY_ID: str
@@ -20,6 +24,34 @@ class Settings(BaseSettings):
     STRIPE_WEBHOOK_SECRET:str
     STRIPE_PRICE_ID:str
     FRONTEND_URL:str
+    MATCHMAKING_MIN_GROUP_SIZE: int = 5
+    MATCHMAKING_MAX_GROUP_SIZE: int = 7  # used when the dinner's city has no active restaurant
+    MATCHMAKING_WARM_TIME_BUDGET: float = 1.0  # seconds per bucket when starting from a provisional partition
+    PAIR_HISTORY_PENALTY: float = 0.5  # compatibility taken off a pair that just dined together, 0 = off
+    PAIR_HISTORY_HALF_LIFE_DAYS: float = 90
+    PAIR_HISTORY_WINDOW_DAYS: int = 365  # older pairs carry no penalty
+    AFFINITY_WEIGHT: float = 0.3  # how much feedback pair affinity adds to compatibility, 0 = off
+    AFFINITY_SHRINKAGE: float = 2.0  # pseudo-ratings pulling sparse affinities towards the prior
+    AFFINITY_MIN_PAIR_VALUE: float = 0.01  # smaller pair affinities are not stored
+    AFFINITY_WINDOW_DAYS: int = 365
+    MATCH_MAX_SAME_GENDER: int = 4  # per group, 0 = no limit
+    MATCH_MAX_AGE_RANGE_YEARS: float = 15  # oldest minus youngest per group, 0 = no limit
+    MATCH_GENDER_CONSTRAINT_HARD: bool = True
+    MATCH_AGE_CONSTRAINT_HARD: bool = False
+    FEEDBACK_AGGREGATION_INTERVAL_SECONDS: int = 3600
+    AUTH_CACHE_TTL_SECONDS: float = 60  # how long a verified access token skips the session/user lookups, 0 = off
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_STATELESS_TOKENS: bool = False  # check access tokens against the revocation list instead of their session
+    AUTH_REVOCATION_REFRESH_SECONDS: float = 5  # how often workers load new revocations; bounds how long a logout takes
+    AUTH_REVOCATION_BLOOM_BITS: int = 1 << 20  # 128 KiB; ~1% false positives at 100k revoked tokens
+    PASSWORD_HASH_WORKERS: int = 4  # threads checking bcrypt hashes at admin login
+    MATCH_PREVIEW_CACHE_SECONDS: int = 300  # how long dry runs reuse a dinner's loaded users and traits
+    MATCHMAKING_WORKERS: int = 0  # process pool size for bucket matching, 0 = one per CPU
+    MATCHMAKER_LEAD_HOURS: int = 48  # match dinners starting within this window
+    MATCHMAKER_MAX_WORKERS: int = 4  # dinners matched concurrently by the cron
+    MATCHMAKER_INTERVAL_SECONDS: int = 600
+    MATCHMAKER_DINNER_TIMEOUT_SECONDS: int = 900
+    MATCHMAKER_ENGINE: str = "exact"  # exact for small buckets, v2 beyond that
 
     class Config:
         env_file = ".env"
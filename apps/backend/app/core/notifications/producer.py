@@ -10,8 +10,26 @@ sqs = boto3.client(
     aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
 )
 
+SQS_BATCH_SIZE = 10  # most messages send_message_batch takes
+
+
 def queue_notification(data: dict):
     return sqs.send_message(
         QueueUrl=settings.SQS_QUEUE_URL,
         MessageBody=json.dumps(data)
     )
+
+
+def queue_notifications(messages: list) -> int:
+    """Queue many notifications, ten per SQS request. Returns how many SQS rejected."""
+    failed = 0
+    for start in range(0, len(messages), SQS_BATCH_SIZE):
+        response = sqs.send_message_batch(
+            QueueUrl=settings.SQS_QUEUE_URL,
+            Entries=[
+                {"Id": str(k), "MessageBody": json.dumps(data)}
+                for k, data in enumerate(messages[start:start + SQS_BATCH_SIZE])
+            ],
+        )
+        failed += len(response.get("Failed", []))
+    return failed
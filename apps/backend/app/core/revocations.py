@@ -0,0 +1,128 @@
+# app/core/revocations.py
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.revoked_token import RevokedToken
+
+BLOOM_HASHES = 7
+REBUILD_SECONDS = 600  # fold the exact set into a fresh Bloom filter this often
+STALE_AFTER_REFRESHES = 3  # a list not refreshed for this many intervals is not trusted
+CLOCK_SKEW = timedelta(seconds=5)  # incremental loads look back this far, for workers whose clocks disagree
+
+
+def _epoch(value: datetime) -> float:
+    # Motor hands back naive UTC datetimes
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings: never misses an added item, sometimes reports one that was not."""
+
+    def __init__(self, bits: int, hashes: int = BLOOM_HASHES):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.bits for i in range(self.hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    The jtis of revoked access tokens, kept in memory so stateless token checks need no
+    database read. Revocations older than the last rebuild live in a Bloom filter, newer
+    ones in an exact set. Every AUTH_REVOCATION_REFRESH_SECONDS each worker loads the
+    rows added to revoked_tokens since its last refresh (the collection's TTL index keeps
+    it to unexpired tokens), so a logout on one worker takes effect on all of them
+    within one interval. Loaded revocations also drop the tokens from the auth cache.
+    """
+
+    def __init__(self, bloom_bits: int, interval: float):
+        self.interval = interval
+        self.bloom = BloomFilter(bloom_bits)
+        self.recent: Dict[str, float] = {}  # jti -> token expiry (epoch seconds)
+        self._cursor: Optional[datetime] = None  # latest revoked_at loaded
+        self._synced_at: Optional[float] = None  # monotonic time of the last successful refresh
+        self._rebuilt_at: Optional[float] = None
+
+    @property
+    def fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= STALE_AFTER_REFRESHES * self.interval
+
+    def is_revoked(self, jti: str) -> Optional[bool]:
+        """True or False when the list can tell; None when only the database can (a Bloom hit, or a stale list)."""
+        if jti in self.recent:
+            return True
+        if not self.fresh or jti in self.bloom:
+            return None
+        return False
+
+    def add(self, jti: str, expires_at: float):
+        """Record a revocation made by this worker without waiting for the next refresh."""
+        self.recent[jti] = expires_at
+        auth_cache.invalidate_jti(jti)
+
+    async def refresh(self):
+        if self._rebuilt_at is None or time.monotonic() - self._rebuilt_at >= REBUILD_SECONDS:
+            await self._rebuild()
+        else:
+            await self._load_since(self._cursor - CLOCK_SKEW if self._cursor else None)
+        self._synced_at = time.monotonic()
+
+    async def _rebuild(self):
+        started = time.monotonic()
+        now = time.time()
+        bloom = BloomFilter(self.bloom.bits, self.bloom.hashes)
+        cursor, count = None, 0
+        async for row in RevokedToken.get_motor_collection().find(
+            {"expires_at": {"$gt": datetime.now(timezone.utc)}}, {"_id": 0, "jti": 1, "revoked_at": 1}
+        ):
+            bloom.add(row["jti"])
+            cursor = row["revoked_at"] if cursor is None else max(cursor, row["revoked_at"])
+            count += 1
+        # Keep what this worker revoked while the rows were loading
+        self.recent = {
+            jti: expires_at for jti, expires_at in self.recent.items() if expires_at > now and jti not in bloom
+        }
+        self.bloom, self._cursor, self._rebuilt_at = bloom, cursor or self._cursor, started
+        logger.info("🔐 Revocation list rebuilt: %d revoked tokens", count)
+
+    async def _load_since(self, since: Optional[datetime]):
+        query = {"revoked_at": {"$gte": since}} if since else {}
+        async for row in RevokedToken.get_motor_collection().find(
+            query, {"_id": 0, "jti": 1, "expires_at": 1, "revoked_at": 1}
+        ):
+            if row["jti"] not in self.recent:
+                self.add(row["jti"], _epoch(row["expires_at"]))
+            self._cursor = row["revoked_at"] if self._cursor is None else max(self._cursor, row["revoked_at"])
+
+    async def run(self):
+        """Refresh forever; started by the app's lifespan."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("❌ Refreshing the revocation list failed")
+            await asyncio.sleep(self.interval)
+
+
+revocation_list = RevocationList(settings.AUTH_REVOCATION_BLOOM_BITS, settings.AUTH_REVOCATION_REFRESH_SECONDS)
@@ -0,0 +1,25 @@
+# app/crons/feedback_aggregator.py
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.init import init_db
+from app.services.matchmaking.affinity import aggregate_affinity_priors
+
+
+async def main(once: bool = False):
+    """Periodically rebuild the feedback-derived affinity priors that matching loads."""
+    await init_db()
+    while True:
+        try:
+            await aggregate_affinity_priors()
+        except Exception:
+            logger.exception("❌ Feedback aggregation failed")
+        if once:
+            break
+        await asyncio.sleep(settings.FEEDBACK_AGGREGATION_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(once="--once" in sys.argv))
@@ -0,0 +1,134 @@
+# app/crons/matchmaker.py
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.init import init_db
+from app.models.dinner import Dinner, DinnerSchedule
+from app.services.matchmaking.incremental import improve_match_states
+from app.services.matchmaking.jobs import submit_match_job, wait_for_match_job
+from app.services.matchmaking.pool import shutdown_executor
+
+# Waits on jobs past their timeout, each holding a worker; at most one per city
+_background_jobs: Dict[str, asyncio.Task] = {}
+
+
+async def find_due_dinners() -> List[DinnerSchedule]:
+    """Unmatched dinners starting within the lead window, earliest deadline first."""
+    now = datetime.now(timezone.utc)
+    return await Dinner.find(
+        Dinner.matched == False,
+        Dinner.date >= now,
+        Dinner.date <= now + timedelta(hours=settings.MATCHMAKER_LEAD_HOURS),
+    ).sort("date").project(DinnerSchedule).to_list()
+
+
+async def match_dinner(dinner: DinnerSchedule) -> Optional[asyncio.Task]:
+    """Match one dinner. Returns the wait for its job if that is still running after the timeout."""
+    try:
+        job = await submit_match_job(dinner.id, engine=settings.MATCHMAKER_ENGINE)
+    except HTTPException as e:
+        # Already matched, or an admin/other worker is matching it right now
+        logger.info("⏭️ Skipping dinner %s (%s): %s", dinner.id, dinner.city, e.detail)
+        return None
+
+    waiter = asyncio.ensure_future(wait_for_match_job(job))
+    done, _ = await asyncio.wait({waiter}, timeout=settings.MATCHMAKER_DINNER_TIMEOUT_SECONDS)
+    if not done:
+        logger.warning("⏱️ Matching dinner %s (%s) is still running after %ss, moving on",
+                       dinner.id, dinner.city, settings.MATCHMAKER_DINNER_TIMEOUT_SECONDS)
+        return waiter
+
+    job = waiter.result()
+    logger.info("🍽️ Dinner %s (%s): job %s %s", dinner.id, dinner.city, job.id, job.status)
+    return None
+
+
+def hold_worker_until_done(waiter: asyncio.Task, dinner: DinnerSchedule, workers: asyncio.Semaphore):
+    """Keep a timed-out job's worker taken until the job ends, so the other lanes can move on without exceeding the bound."""
+    async def hold():
+        try:
+            job = await waiter
+            logger.info("🍽️ Dinner %s (%s): job %s %s after the timeout", dinner.id, dinner.city, job.id, job.status)
+        except Exception:
+            logger.exception("❌ Matching dinner %s (%s) failed", dinner.id, dinner.city)
+        finally:
+            workers.release()
+
+    task = asyncio.create_task(hold())
+    _background_jobs[dinner.city] = task
+    task.add_done_callback(lambda _: _background_jobs.pop(dinner.city, None))
+
+
+async def run_city_lane(dinners: List[DinnerSchedule], workers: asyncio.Semaphore):
+    for k, dinner in enumerate(dinners):
+        if dinner.city in _background_jobs:
+            # One job per city at a time, so a slow city can't take over the workers;
+            # its remaining dinners are still unmatched and come back next pass
+            logger.info("⏳ %s still has a job running, leaving %d dinners for the next pass",
+                        dinner.city, len(dinners) - k)
+            return
+        await workers.acquire()
+        waiter = None
+        try:
+            waiter = await match_dinner(dinner)
+        except Exception:
+            logger.exception("❌ Matching dinner %s (%s) failed", dinner.id, dinner.city)
+        finally:
+            if waiter is None:
+                workers.release()
+            else:
+                hold_worker_until_done(waiter, dinner, workers)
+
+
+async def run_once(workers: asyncio.Semaphore):
+    """
+    Match every due dinner. Each city gets its own lane (dinners in deadline order), and
+    lanes share a bounded pool of workers, so a slow or failing city never delays the
+    other cities' dinners. A job past its timeout keeps its worker until it ends, also
+    across passes, so at most MATCHMAKER_MAX_WORKERS jobs ever run at once, and its
+    city's lane pauses until then, so a city never holds more than one worker.
+    """
+    dinners = await find_due_dinners()
+    if not dinners:
+        return
+
+    lanes: Dict[str, List[DinnerSchedule]] = defaultdict(list)
+    for dinner in dinners:  # already sorted by date, so lanes come out in deadline order too
+        lanes[dinner.city].append(dinner)
+
+    logger.info("🗓️ %d dinners due across %d cities", len(dinners), len(lanes))
+    await asyncio.gather(*(run_city_lane(city_dinners, workers) for city_dinners in lanes.values()))
+
+
+async def main(once: bool = False):
+    await init_db()
+    workers = asyncio.Semaphore(settings.MATCHMAKER_MAX_WORKERS)
+    try:
+        while True:
+            try:
+                await run_once(workers)
+            except Exception:
+                logger.exception("❌ Matchmaker pass failed")
+            try:
+                # Keep the provisional partitions of dinners still taking opt-ins close to final
+                await improve_match_states()
+            except Exception:
+                logger.exception("❌ Improving provisional groups failed")
+            if once:
+                # Let timed-out jobs finish instead of leaving them "running" when the loop closes
+                await asyncio.gather(*_background_jobs.values())
+                break
+            await asyncio.sleep(settings.MATCHMAKER_INTERVAL_SECONDS)
+    finally:
+        shutdown_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(once="--once" in sys.argv))
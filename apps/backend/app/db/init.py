@@ -15,6 +15,12 @@ from app.models.session import Session
 from app.models.dinner import Dinner, DinnerGroup
 from app.models.admin import AdminUser
 from app.models.venue import Venue
+from app.models.match_job import MatchJob
+from app.models.match_run import MatchRun
+from app.models.match_state import MatchBucketState
+from app.models.pair_history import PairHistory
+from app.models.affinity import AffinityPrior
+from app.models.revoked_token import RevokedToken
 
 async def init_db():
     client = AsyncIOMotorClient(settings.MONGO_URI)
@@ -34,6 +40,12 @@ async def init_db():
             DinnerGroup,
             AdminUser,
             Venue,
+            MatchJob,
+            MatchRun,
+            MatchBucketState,
+            PairHistory,
+            AffinityPrior,
+            RevokedToken,
             
         ]
     )
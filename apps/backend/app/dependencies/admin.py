@@ -1,8 +1,9 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException
 from app.models.admin import AdminUser
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.auth_cache import auth_cache
 from app.utils.jwt import decode_token
-from app.models.session import Session
+from app.services.session import ensure_access_token_active
 
 security = HTTPBearer(auto_error=True)
 
@@ -13,24 +14,25 @@ async def get_current_admin(
         raise HTTPException(status_code=401, detail="Invalid authentication scheme")
 
     token = credentials.credentials
+    cached = auth_cache.get("admin", token)
+    if cached is not None:
+        return cached
+
     payload = decode_token(token, expected_type="access")
     email = payload.get("sub")
 
     # ✅ Check if session exists and is active
-    session = await Session.find_one(Session.access_token == token)
-    if not session or not session.is_active:
-        raise HTTPException(status_code=401, detail="Session not active or token expired")
+    await ensure_access_token_active(token, payload)
 
     user = await AdminUser.find_one(AdminUser.email == email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    auth_cache.put("admin", token, email, user, token_expires_at=payload.get("exp"), jti=payload.get("jti"))
     return user
 
-async def get_current_admin_user(token_user = Depends(get_current_admin)):
-    admin = await AdminUser.find_one(AdminUser.email == token_user.email)
-    if not admin:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not an admin")
-    return admin
+async def get_current_admin_user(token_user: AdminUser = Depends(get_current_admin)) -> AdminUser:
+    # get_current_admin already loaded (or took from the auth cache) the AdminUser for this token
+    return token_user
 
 
@@ -1,8 +1,9 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.auth_cache import auth_cache
 from app.utils.jwt import decode_token
 from app.models.user import User
-from app.models.session import Session
+from app.services.session import ensure_access_token_active
 
 security = HTTPBearer(auto_error=True)
 
@@ -13,16 +14,19 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="Invalid authentication scheme")
 
     token = credentials.credentials
+    cached = auth_cache.get("user", token)
+    if cached is not None:
+        return cached
+
     payload = decode_token(token, expected_type="access")
     email = payload.get("sub")
 
     # ✅ Check if session exists and is active
-    session = await Session.find_one(Session.access_token == token)
-    if not session or not session.is_active:
-        raise HTTPException(status_code=401, detail="Session not active or token expired")
+    await ensure_access_token_active(token, payload)
 
     user = await User.find_one(User.email == email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    auth_cache.put("user", token, email, user, token_expires_at=payload.get("exp"), jti=payload.get("jti"))
     return user
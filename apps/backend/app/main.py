@@ -1,10 +1,14 @@
 # app/main.py
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.db.init import init_db
 from app.core.logger import logger
+from app.core.revocations import revocation_list
+from app.services.matchmaking.pool import shutdown_executor
+from app.utils import hashing
 from fastapi.responses import JSONResponse
 from fastapi.requests import Request
 from fastapi.exceptions import RequestValidationError
@@ -22,8 +26,13 @@ async def lifespan(app: FastAPI):
     logger.info("🔄 App starting up...")
     await init_db()
     logger.info("✅ DB initialized")
+    # Revoked access tokens: stateless token checks and every worker's auth cache rely on it
+    revocations = asyncio.create_task(revocation_list.run())
     yield
     logger.info("⛔ App shutting down...")
+    revocations.cancel()
+    shutdown_executor()
+    hashing.shutdown_executor()
 app = FastAPI(lifespan=lifespan)
 
 # CORS Middleware (adjust origins in prod)
@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import EmailStr, Field
 from typing import Optional
+from pymongo import IndexModel
 
 class AdminUser(Document):
     email: EmailStr
@@ -10,3 +11,4 @@ class AdminUser(Document):
 
     class Settings:
         name = "admin_users"
+        indexes = [IndexModel([("email", 1)])]
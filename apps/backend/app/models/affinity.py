@@ -0,0 +1,23 @@
+# app/models/affinity.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+from typing import Dict
+from datetime import datetime, timezone
+
+
+class AffinityPrior(Document):
+    """
+    Feedback-derived priors for one user, rebuilt by the feedback aggregator.
+    Values are in rating points / 4, centred on the average table, so 0 means "as usual".
+    """
+    user_id: PydanticObjectId
+    rater_bias: float = 0.0  # how much more generously this user rates than average
+    affinity: float = 0.0  # how much better tables with this user went than average
+    partners: Dict[str, float] = Field(default_factory=dict)  # partner id -> pair affinity
+    ratings: int = 0  # ratings this user gave in the window
+    computed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "affinity_priors"
+        indexes = [IndexModel([("user_id", 1)], unique=True), IndexModel([("computed_at", 1)])]
@@ -2,6 +2,7 @@ from datetime import datetime
 from beanie import Document, PydanticObjectId
 from typing import List, Optional
 from pydantic import Field, BaseModel
+from pymongo import IndexModel
 
 class DinnerOptInUser(BaseModel):
     user_id: PydanticObjectId
@@ -13,9 +14,21 @@ class Dinner(Document):
     country: str
     opted_in_users: List[DinnerOptInUser] = Field(default_factory=list)
     matched: bool = False  # <== NEW
+    match_job_id: Optional[str] = None  # MatchJob whose groups are live
 
     class Settings:
         name = "dinners"
+        indexes = [
+            IndexModel([("city", 1), ("country", 1), ("date", 1)]),  # upcoming dinners for a user's city
+            IndexModel([("matched", 1), ("date", 1)]),  # matchmaker cron
+            IndexModel([("opted_in_users.user_id", 1)]),
+        ]
+
+class DinnerSchedule(BaseModel):
+    """Projection of a dinner without its opt-in list, for scheduling queries."""
+    id: PydanticObjectId = Field(alias="_id")
+    date: datetime
+    city: str
 
 class DinnerGroup(Document):  # should be Document, not BaseModel
     dinner_id: PydanticObjectId  # FK to Dinner
@@ -24,9 +37,14 @@ class DinnerGroup(Document):  # should be Document, not BaseModel
     participant_ids: List[PydanticObjectId] = Field(default_factory=list)
     venue_id: Optional[PydanticObjectId]
     match_score: Optional[float] = None  # <== NEW
+    match_job_id: Optional[str] = None  # MatchJob that computed the group
 
     class Settings:
         name = "dinner_groups"
+        indexes = [
+            IndexModel([("dinner_id", 1), ("venue_id", 1)]),
+            IndexModel([("participant_ids", 1)]),  # a user's bookings
+        ]
 class DinnerGroupResponse(BaseModel):
     id: str
     dinner_id: str
@@ -1,12 +1,20 @@
-from beanie import Document
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
 from typing import Optional
 from datetime import datetime, timezone
 
 class Feedback(Document):
-    user_id: str
-    dinner_group_id: str
+    user_id: PydanticObjectId
+    dinner_group_id: PydanticObjectId
+    dinner_id: PydanticObjectId
     rating: int  # 1 to 5
-    comments: Optional[str]
-    submitted_at: datetime = datetime.now(timezone.utc)
+    comments: Optional[str] = None
+    submitted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     class Settings:
         name = "feedbacks"
+        # One rating per user and group; resubmitting replaces it
+        indexes = [
+            IndexModel([("user_id", 1), ("dinner_group_id", 1)], unique=True),
+            IndexModel([("submitted_at", 1)]),
+        ]
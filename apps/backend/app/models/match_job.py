@@ -0,0 +1,43 @@
+# app/models/match_job.py
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+from datetime import datetime, timezone
+from pymongo import IndexModel
+
+ACTIVE_JOB_STATUSES = ["queued", "running"]
+
+
+class MatchJobBucket(BaseModel):
+    budget_category: Optional[str] = None
+    dietary_category: Optional[str] = None
+    users: int
+    status: Literal["pending", "solved", "skipped"] = "pending"
+    groups: int = 0
+    warm_started: bool = False  # solved from the provisional partition kept at opt-in time
+    solve_seconds: Optional[float] = None
+
+
+class MatchJob(Document):
+    dinner_id: PydanticObjectId
+    engine: str
+    seed: Optional[int] = None
+    # Unset bounds are resolved when the job starts (settings / the city's restaurants)
+    min_group_size: Optional[int] = None
+    max_group_size: Optional[int] = None
+    # Group composition limits the job ran with (GroupConstraints), resolved from settings at start
+    constraints: Optional[dict] = None
+    status: Literal["queued", "running", "completed", "skipped", "failed"] = "queued"
+    phase: Optional[Literal["loading", "bucketing", "solving", "persisting"]] = None
+    buckets: List[MatchJobBucket] = Field(default_factory=list)
+    timings: Dict[str, float] = Field(default_factory=dict)  # phase -> seconds
+    summary: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "match_jobs"
+        indexes = [IndexModel([("dinner_id", 1), ("status", 1)])]
@@ -0,0 +1,53 @@
+# app/models/match_run.py
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from pymongo import IndexModel
+
+
+class MatchRunBucket(BaseModel):
+    budget_category: Optional[str] = None
+    dietary_category: Optional[str] = None
+    users: int
+    groups: int = 0
+    ungrouped: int = 0
+    warm_started: bool = False
+    solve_seconds: Optional[float] = None
+
+
+class MatchRun(Document):
+    """One matching run of a dinner: what ran, how long each stage took, and how good the groups were."""
+    dinner_id: PydanticObjectId
+    job_id: Optional[PydanticObjectId] = None
+    engine: str
+    engine_version: str
+    seed: Optional[int] = None
+    min_group_size: Optional[int] = None
+    max_group_size: Optional[int] = None
+    constraints: Optional[dict] = None
+    status: str  # completed, skipped or failed
+    error: Optional[str] = None
+
+    opted_in_users: int = 0
+    candidate_users: int = 0
+    groups_created: int = 0
+    buckets: List[MatchRunBucket] = Field(default_factory=list)
+
+    load_seconds: Optional[float] = None
+    persist_seconds: Optional[float] = None
+    timings: Dict[str, float] = Field(default_factory=dict)  # phase -> seconds
+
+    score_histogram: List[int] = Field(default_factory=list)  # 10 bins over [0, 1]
+    score_percentiles: Dict[str, float] = Field(default_factory=dict)  # p0, p10, ..., p100
+
+    # Why users were left out: missing_scores, bucket_too_small, leftover
+    ungrouped_reasons: Dict[str, int] = Field(default_factory=dict)
+    # Groups breaking a composition limit (gender, age); hard limits only when a bucket left no other way
+    constraint_violations: Dict[str, int] = Field(default_factory=dict)
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "match_runs"
+        indexes = [IndexModel([("dinner_id", 1), ("created_at", -1)]), IndexModel([("created_at", -1)])]
@@ -0,0 +1,35 @@
+# app/models/match_state.py
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import IndexModel
+from typing import List, Optional
+from datetime import datetime, timezone
+
+
+class MatchStateMember(BaseModel):
+    user_id: PydanticObjectId
+    traits: List[float]  # personality scores in compatibility.TRAITS order
+
+
+class MatchBucketState(Document):
+    """
+    Matching state of one preference bucket of an unmatched dinner, kept up to date as
+    users opt in: the members with their trait vectors and a provisional partition that
+    the matchmaker keeps improving in the background. Removed once the dinner is matched.
+    """
+    dinner_id: PydanticObjectId
+    city: str
+    budget_category: Optional[str] = None
+    dietary_category: Optional[str] = None
+    members: List[MatchStateMember] = Field(default_factory=list)
+    groups: List[List[PydanticObjectId]] = Field(default_factory=list)  # provisional partition
+    members_version: int = 0  # bumped on every opt-in
+    dirty: bool = True  # members changed since the partition was last improved
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "match_bucket_states"
+        indexes = [
+            IndexModel([("dinner_id", 1), ("budget_category", 1), ("dietary_category", 1)], unique=True),
+            IndexModel([("dirty", 1), ("updated_at", 1)]),
+        ]
@@ -1,9 +1,18 @@
 from beanie import Document
 from pydantic import Field
 from datetime import datetime, timezone
+from pymongo import IndexModel
 
 class OTP(Document):
     email: str
     otp: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     expires_at: datetime
+
+    class Settings:
+        indexes = [
+            # One OTP per email: enforces the resend cooldown. Named apart from the older non-unique
+            # email_1, which expire_auth_documents drops after removing duplicate OTPs
+            IndexModel([("email", 1)], name="email_unique", unique=True),
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),  # Mongo deletes OTPs once they expire
+        ]
@@ -0,0 +1,25 @@
+# app/models/pair_history.py
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import IndexModel
+from typing import Dict
+from datetime import datetime, timezone
+
+
+class DiningPartner(BaseModel):
+    times: int = 0
+    last_dined_at: datetime
+
+
+class PairHistory(Document):
+    """
+    One user's row of the co-dining adjacency: everyone they were grouped with, keyed
+    by the partner's id, with how often and how recently. Updated when groups are persisted.
+    """
+    user_id: PydanticObjectId
+    partners: Dict[str, DiningPartner] = Field(default_factory=dict)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "pair_history"
+        indexes = [IndexModel([("user_id", 1)], unique=True)]
@@ -1,5 +1,6 @@
 from beanie import Document
 from typing import Optional
+from pymongo import IndexModel
 
 class Restaurant(Document):
     name: str
@@ -13,3 +14,4 @@ class Restaurant(Document):
 
     class Settings:
         name = "restaurants"
+        indexes = [IndexModel([("city", 1), ("is_active", 1), ("max_group_size", 1)])]
@@ -0,0 +1,20 @@
+# app/models/revoked_token.py
+from beanie import Document
+from pydantic import Field
+from datetime import datetime, timezone
+from pymongo import IndexModel
+
+
+class RevokedToken(Document):
+    """An access token revoked before its expiry (logout or refresh), by its jti claim."""
+    jti: str
+    expires_at: datetime  # the token's own exp: once past, the token is rejected anyway
+    revoked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "revoked_tokens"
+        indexes = [
+            IndexModel([("jti", 1)], unique=True),
+            IndexModel([("revoked_at", 1)]),  # workers load the revocations since their last refresh
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),  # Mongo deletes them once the token expires
+        ]
@@ -3,6 +3,7 @@ from beanie import Document
 from datetime import datetime
 from pydantic import  EmailStr
 from typing import Optional, Literal
+from pymongo import IndexModel
 
 
 class Session(Document):
@@ -18,4 +19,9 @@ class Session(Document):
     type: Optional[Literal["user", "admin"]]= "user"  # <-- new field
 
     class Settings:
-        name = "sessions"
\ No newline at end of file
+        name = "sessions"
+        indexes = [
+            IndexModel([("access_token", 1)]),  # every authenticated request
+            IndexModel([("refresh_token", 1)]),  # refresh and logout
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),  # Mongo deletes sessions once they expire
+        ]
\ No newline at end of file
@@ -3,6 +3,7 @@ from beanie import Document
 from pydantic import EmailStr, Field
 from typing import Optional
 from datetime import datetime
+from pymongo import IndexModel
 
 class Subscription(Document):
     user_email: EmailStr
@@ -13,4 +14,8 @@ class Subscription(Document):
     end_date: Optional[datetime] = None
 
     class Settings:
-        name = "subscriptions"
\ No newline at end of file
+        name = "subscriptions"
+        indexes = [
+            IndexModel([("user_email", 1), ("status", 1)]),
+            IndexModel([("stripe_subscription_id", 1)]),  # Stripe webhooks
+        ]
\ No newline at end of file
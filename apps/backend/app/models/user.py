@@ -1,7 +1,8 @@
-from beanie import Document
+from beanie import Document, PydanticObjectId
 from pydantic import EmailStr, Field, BaseModel
 from typing import Optional, Dict, List
 from datetime import date, datetime
+from pymongo import IndexModel
 
 class PersonalityAnswer(BaseModel):
     trait: str  # One of "O", "C", "E", "A", "N"
@@ -39,3 +40,14 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [IndexModel([("email", 1)])]
+
+
+class UserMatchProfile(BaseModel):
+    """Projection of User with only the fields matchmaking reads."""
+    id: PydanticObjectId = Field(alias="_id")
+    email: EmailStr
+    name: Optional[str] = ""
+    dob: Optional[date] = None
+    gender: Optional[str] = ""
+    personality_scores: Optional[Dict[str, float]] = Field(default_factory=dict)
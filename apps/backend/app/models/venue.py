@@ -2,8 +2,9 @@
 
 from beanie import Document
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 from uuid import uuid4
+from pymongo import IndexModel
 
 class Venue(Document):
     name: str
@@ -13,6 +14,10 @@ class Venue(Document):
     google_maps_url: Optional[str] = ""
     contact_number: Optional[str] = ""
     is_active: bool = True  # to allow deactivating venues without deleting
+    capacity: int = 1  # groups it can host on one dinner night
+    max_group_size: Optional[int] = None  # largest table, None = any group fits
+    budget_tiers: List[str] = Field(default_factory=list)  # budget categories it suits, empty = all
 
     class Settings:
         name = "venues"
+        indexes = [IndexModel([("city", 1), ("is_active", 1)]), IndexModel([("name", 1)])]
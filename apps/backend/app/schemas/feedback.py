@@ -0,0 +1,17 @@
+# app/schemas/feedback.py
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class SubmitFeedbackRequest(BaseModel):
+    dinner_group_id: PydanticObjectId
+    rating: int = Field(..., ge=1, le=5, description="How the dinner with this group went, 1 to 5")
+    comments: Optional[str] = Field(None, max_length=2000)
+
+
+class FeedbackResponse(BaseModel):
+    feedback_id: PydanticObjectId
+    dinner_group_id: PydanticObjectId
+    rating: int
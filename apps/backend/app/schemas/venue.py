@@ -1,7 +1,7 @@
 # app/schemas/venue.py
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class CreateVenueRequest(BaseModel):
@@ -9,6 +9,9 @@ class CreateVenueRequest(BaseModel):
     address: str
     city: str
     country: str
+    capacity: int = 1
+    max_group_size: Optional[int] = None
+    budget_tiers: List[str] = []
 
 
 class UpdateVenueRequest(BaseModel):
@@ -17,6 +20,16 @@ class UpdateVenueRequest(BaseModel):
     city: Optional[str]
     country: Optional[str]
     is_active: Optional[bool]
+    capacity: Optional[int] = None
+    max_group_size: Optional[int] = None
+    budget_tiers: Optional[List[str]] = None
+
+
+class VenueAssignmentResponse(BaseModel):
+    dinner_id: str
+    assigned: int
+    unassigned_group_ids: List[str]  # no active venue in the city had a fitting table left
+    notified_users: int
 
 
 class VenueResponse(BaseModel):
@@ -26,3 +39,6 @@ class VenueResponse(BaseModel):
     city: str
     country: str
     is_active: bool
+    capacity: int = 1
+    max_group_size: Optional[int] = None
+    budget_tiers: List[str] = []
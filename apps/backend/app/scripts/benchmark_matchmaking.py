@@ -0,0 +1,214 @@
+"""
+Matchmaking benchmark on seeded synthetic populations.
+
+    python -m app.scripts.benchmark_matchmaking --sizes 100,1000,10000 --engines v1,v2 \
+        --min-size 5 --max-size 7 --constraints none,gender,age,gender+age \
+        --output matchmaking_benchmark.json
+
+Every engine solves one bucket per population size and constraint set. Wall time, peak
+traced memory (from a second, traced run), group match_score stats, ungrouped users
+and groups over the gender/age limits are written as JSON so runs on different commits
+can be diffed. v2 cases also time one swap evaluation, the step constraints make dearer.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+from faker import Faker
+
+from app.schemas.user import PersonalityAnswer
+from app.services.matchmaking.compatibility import build_trait_matrix, compatibility_matrix, group_score
+from app.services.matchmaking.constraints import GroupConstraints, GroupFeatures
+from app.services.matchmaking.engines import MATCHMAKING_SOLVERS
+from app.services.matchmaking.v2 import _best_swap
+from app.services.matchmaking.v1 import QUESTION_TRAIT_MAP, compute_personality_scores
+
+GENDERS = ["female", "male", "non-binary"]
+GENDER_WEIGHTS = [0.45, 0.45, 0.1]
+DINNER_DATE = datetime(2025, 1, 1)
+
+# Engines that materialise the full n x n pair matrix (8 * n^2 bytes)
+DENSE_ENGINES = {"v1"}
+
+
+def generate_population(size: int, seed: int) -> np.ndarray:
+    """Trait array for `size` synthetic users answering the 15 yes/no questions."""
+    fake = Faker()
+    fake.seed_instance(seed)
+    scores = []
+    for _ in range(size):
+        answers = [
+            PersonalityAnswer(trait=QUESTION_TRAIT_MAP[i], question="", answer="yes" if fake.pybool() else "no")
+            for i in range(15)
+        ]
+        scores.append(compute_personality_scores(answers))
+    return build_trait_matrix(scores)
+
+
+def generate_features(size: int, seed: int, constraints: GroupConstraints) -> GroupFeatures:
+    """Gender and age (22-60) of the same synthetic users, as the engines see them."""
+    rng = np.random.default_rng(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+    users = [
+        SimpleNamespace(gender=gender, dob=fake.date_of_birth(minimum_age=22, maximum_age=60))
+        for gender in rng.choice(GENDERS, size=size, p=GENDER_WEIGHTS)
+    ]
+    return GroupFeatures.from_users(constraints, users, DINNER_DATE)
+
+
+def parse_constraints(spec: str) -> GroupConstraints:
+    """none, gender, age or gender+age: the production limits (settings) for the named features."""
+    limits = GroupConstraints.from_settings()
+    names = set() if spec == "none" else set(spec.split("+"))
+    if names - {"gender", "age"}:
+        raise ValueError(f"unknown constraint set {spec!r}")
+    return limits.model_copy(update={
+        "max_same_gender": limits.max_same_gender if "gender" in names else None,
+        "max_age_range": limits.max_age_range if "age" in names else None,
+    })
+
+
+def score_groups(traits: np.ndarray, groups) -> list:
+    """match_score of each group, computed the same way as for persisted DinnerGroups."""
+    scores = []
+    for group in groups:
+        block = compatibility_matrix(traits[group])
+        scores.append(group_score(block, list(range(len(group)))))
+    return scores
+
+
+def run_case(
+    engine: str,
+    traits: np.ndarray,
+    seed: int,
+    measure_memory: bool = True,
+    features: Optional[GroupFeatures] = None,
+    audit: Optional[GroupFeatures] = None,
+    **size_range,
+) -> dict:
+    """Solve once (twice with memory tracing); `features` go to the engine, `audit` counts violations."""
+    solver = MATCHMAKING_SOLVERS[engine]
+    options = dict(size_range, group_features=features)
+    started = time.perf_counter()
+    groups = solver(traits, seed=seed, **options)
+    wall = time.perf_counter() - started
+
+    # tracemalloc slows pure-Python loops down a lot, so memory gets its own run
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        solver(traits, seed=seed, **options)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    placed = [i for group in groups for i in group]
+    scores = score_groups(traits, groups)
+    violations = [audit.violations(group) for group in groups] if audit is not None else []
+    return {
+        "status": "ok",
+        "wall_seconds": round(wall, 4),
+        "peak_memory_mb": round(peak / 2**20, 2) if peak is not None else None,
+        "groups": len(groups),
+        "group_sizes": dict(sorted(Counter(len(group) for group in groups).items())),
+        "mean_match_score": float(np.mean(scores)) if scores else None,
+        "min_match_score": float(np.min(scores)) if scores else None,
+        "ungrouped_users": len(traits) - len(placed),
+        "valid_partition": len(placed) == len(set(placed)),
+        "gender_violations": sum(gender > 0 for gender, _ in violations),
+        "age_violations": sum(age > 0 for _, age in violations),
+    }
+
+
+def time_swaps(traits: np.ndarray, seed: int, features: Optional[GroupFeatures], rounds: int = 5000) -> float:
+    """Mean microseconds of one v2 swap evaluation between two random groups of 6."""
+    rng = random.Random(seed)
+    order = list(range(len(traits)))
+    rng.shuffle(order)
+    groups = [order[start:start + 6] for start in range(0, len(order) - 5, 6)]
+    pairs = [rng.sample(range(len(groups)), 2) for _ in range(rounds)]
+    started = time.perf_counter()
+    for g, h in pairs:
+        _best_swap(traits, groups[g], groups[h], True, features=features)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matchmaking engines on synthetic populations")
+    parser.add_argument("--sizes", default="100,1000,10000,100000")
+    parser.add_argument("--engines", default=",".join(MATCHMAKING_SOLVERS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dense-limit", type=int, default=5000,
+                        help="skip engines that build the full pair matrix above this many users")
+    parser.add_argument("--min-size", type=int, help="smallest group size (default: fixed groups of 6)")
+    parser.add_argument("--max-size", type=int, help="largest group size")
+    parser.add_argument("--constraints", default="none",
+                        help="comma-separated constraint sets to compare: none, gender, age, gender+age")
+    parser.add_argument("--skip-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--output", default="matchmaking_benchmark.json")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    engines = args.engines.split(",")
+    unknown = [e for e in engines if e not in MATCHMAKING_SOLVERS]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)}")
+    try:
+        constraint_sets = {spec: parse_constraints(spec) for spec in args.constraints.split(",")}
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = []
+    for size in sizes:
+        traits = generate_population(size, args.seed)
+        # Violations are always counted against both limits, including for engines not given them
+        audit = generate_features(size, args.seed, parse_constraints("gender+age"))
+        for spec, constraints in constraint_sets.items():
+            features = GroupFeatures(constraints, audit.genders, audit.ages) if constraints.active else None
+            for engine in engines:
+                case = {"engine": engine, "users": size, "constraints": spec}
+                if engine in DENSE_ENGINES and size > args.dense_limit:
+                    case.update(status="skipped", reason=f"dense pair matrix above --dense-limit={args.dense_limit}")
+                else:
+                    case.update(run_case(
+                        engine, traits, args.seed, measure_memory=not args.skip_memory, features=features, audit=audit,
+                        min_size=args.min_size, max_size=args.max_size,
+                    ))
+                    if engine == "v2" and size >= 12:
+                        case["swap_microseconds"] = round(time_swaps(traits, args.seed, features), 1)
+                results.append(case)
+                print(json.dumps(case))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "group_size_range": [args.min_size, args.max_size],
+        "constraints": {spec: constraints.model_dump() for spec, constraints in constraint_sets.items()},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+SMTP throughput against a local aiosmtpd stand-in, pooled vs one connection per email.
+
+    pip install aiosmtpd
+    python -m app.scripts.benchmark_smtp --messages 500 --threads 1,4
+
+Starts an in-process SMTP server that requires AUTH and discards what it receives, then
+sends the same messages the old way (connect, EHLO, LOGIN, send, QUIT for each one) and
+through SMTPPool, once per thread count. Midway through each pooled run the server
+drops every open connection, so the run also covers reconnecting. Without STARTTLS the
+stand-in understates what pooling saves against a real server, where every new
+connection also pays a TLS handshake and network round trips.
+"""
+import argparse
+import logging
+import smtplib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+
+from app.services.smtp_pool import SMTPPool
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+except ImportError:  # dev-only dependency
+    Controller = None
+
+USERNAME, PASSWORD = "bench@example.com", "secret"
+
+
+class _CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def _authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=auth_data.login.decode() == USERNAME and auth_data.password.decode() == PASSWORD)
+
+
+def _message(k: int) -> MIMEText:
+    message = MIMEText(f"Benchmark message {k}")
+    message["Subject"] = f"Benchmark {k}"
+    message["From"] = USERNAME
+    message["To"] = f"user{k}@example.com"
+    return message
+
+
+def _send_unpooled(host: str, port: int, message: MIMEText):
+    with smtplib.SMTP(host, port) as server:
+        server.login(USERNAME, PASSWORD)
+        server.send_message(message)
+
+
+def _run(send, messages: int, threads: int, on_halfway=None) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        half = messages // 2
+        list(executor.map(send, range(half)))
+        if on_halfway:
+            on_halfway()
+        list(executor.map(send, range(half, messages)))
+    return time.perf_counter() - start
+
+
+def _drop_connections(controller):
+    # Close every client transport, as a server restart or idle timeout would
+    for transport in list(controller._transports):
+        controller.loop.call_soon_threadsafe(transport.close)
+    time.sleep(0.1)
+
+
+class _TrackingController(Controller if Controller else object):
+    """aiosmtpd Controller that remembers client transports, so the benchmark can cut them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._transports = set()
+
+    def factory(self):
+        smtp = super().factory()
+        connection_made = smtp.connection_made
+
+        def tracked(transport):
+            self._transports.add(transport)
+            return connection_made(transport)
+
+        smtp.connection_made = tracked
+        return smtp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SMTP throughput, pooled vs unpooled, against a local stand-in")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--threads", default="1,4", help="comma-separated sender thread counts")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    if Controller is None:
+        print("❌ aiosmtpd is not installed: pip install aiosmtpd")
+        sys.exit(1)
+
+    logging.getLogger("mail.log").setLevel(logging.ERROR)  # aiosmtpd warns about its own login_data on every AUTH
+    handler = _CountingHandler()
+    controller = _TrackingController(
+        handler, hostname="127.0.0.1", port=args.port,
+        authenticator=_authenticate, auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        for threads in [int(t) for t in args.threads.split(",")]:
+            handler.received = 0
+            elapsed = _run(lambda k: _send_unpooled("127.0.0.1", args.port, _message(k)), args.messages, threads)
+            unpooled = args.messages / elapsed
+            assert handler.received == args.messages, handler.received
+
+            handler.received = 0
+            pool = SMTPPool("127.0.0.1", args.port, USERNAME, PASSWORD, starttls=False, size=threads)
+            elapsed = _run(lambda k: pool.send_message(_message(k)), args.messages, threads,
+                           on_halfway=lambda: _drop_connections(controller))
+            pool.close()
+            pooled = args.messages / elapsed
+            assert handler.received == args.messages, handler.received
+
+            print(f"✅ {threads} thread(s): unpooled {unpooled:.0f} msg/s, pooled {pooled:.0f} msg/s "
+                  f"({pooled / unpooled:.1f}x, {pool.connects} connections incl. reconnects)")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
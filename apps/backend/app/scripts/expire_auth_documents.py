@@ -0,0 +1,78 @@
+"""
+One-off backfill for the OTP and session TTL indexes.
+
+    python -m app.scripts.expire_auth_documents
+
+init_db creates the TTL indexes; Mongo then removes each document once its
+expires_at passes. This brings older documents in line: sessions logged out before
+logout started expiring them are expired now, documents whose expires_at is missing
+or not a date (the TTL monitor skips those) are fixed or removed, and everything
+already expired is deleted right away instead of waiting for the monitor.
+
+Run it before deploying the unique OTP email index: init_db can't build it while
+an email has several OTPs, so before connecting through init_db this removes all
+but the newest OTP per email and drops the old non-unique email_1 index.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.db.init import init_db
+from app.models.otp import OTP
+from app.models.session import Session
+from app.utils.jwt import REFRESH_TOKEN_EXPIRE_DAYS
+
+NOT_A_DATE = {"expires_at": {"$not": {"$type": "date"}}}
+
+
+async def prepare_otp_email_index(now: datetime):
+    """Leave at most one unexpired OTP per email, so init_db can build OTP.email_unique."""
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    otps = client[settings.DATABASE_NAME][OTP.__name__]  # OTP keeps Beanie's default collection name
+    expired = await otps.delete_many({"$or": [NOT_A_DATE, {"expires_at": {"$lte": now}}]})
+
+    duplicates = 0
+    async for email in otps.aggregate([
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$email", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]):
+        duplicates += (await otps.delete_many({"_id": {"$in": email["ids"][1:]}})).deleted_count
+
+    dropped = "email_1" in await otps.index_information()
+    if dropped:
+        await otps.drop_index("email_1")
+    print(f"✅ OTP email index: {expired.deleted_count} expired and {duplicates} duplicate OTPs deleted"
+          f"{', old email_1 index dropped' if dropped else ''}")
+
+
+async def expire_auth_documents():
+    now = datetime.now(timezone.utc)
+    await prepare_otp_email_index(now)
+    await init_db()
+    sessions = Session.get_motor_collection()
+    otps = OTP.get_motor_collection()
+
+    logged_out = await sessions.update_many(
+        {"is_active": False, "expires_at": {"$gt": now}}, {"$set": {"expires_at": now}}
+    )
+    # A session lives as long as its refresh token
+    undated_sessions = await sessions.update_many(NOT_A_DATE, [{"$set": {"expires_at": {"$add": [
+        {"$ifNull": ["$created_at", now]}, REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600 * 1000
+    ]}}}])
+    undated_otps = await otps.delete_many(NOT_A_DATE)
+
+    expired_sessions = await sessions.delete_many({"expires_at": {"$lte": now}})
+    expired_otps = await otps.delete_many({"expires_at": {"$lte": now}})
+
+    print(f"✅ Sessions: {logged_out.modified_count} logged-out expired, "
+          f"{undated_sessions.modified_count} given an expiry, {expired_sessions.deleted_count} deleted "
+          f"({await sessions.count_documents({})} left)")
+    print(f"✅ OTPs: {undated_otps.deleted_count} without expiry and {expired_otps.deleted_count} expired deleted "
+          f"({await otps.count_documents({})} left)")
+
+
+if __name__ == "__main__":
+    asyncio.run(expire_auth_documents())
@@ -0,0 +1,106 @@
+"""
+Check that every hot query is served by an index.
+
+    python -m app.scripts.explain_hot_queries
+
+Connects like the API (init_db also creates any index declared on the models that is
+missing), runs explain() on each query the request paths and crons issue, and exits
+non-zero if any winning plan contains a COLLSCAN. Run it after adding a query or
+changing a model's indexes; tests/test_indexes.py runs the same check under pytest.
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from beanie import PydanticObjectId
+
+from app.db.init import init_db
+from app.models.admin import AdminUser
+from app.models.affinity import AffinityPrior
+from app.models.dinner import Dinner, DinnerGroup
+from app.models.feedback import Feedback
+from app.models.match_job import ACTIVE_JOB_STATUSES, MatchJob
+from app.models.match_run import MatchRun
+from app.models.match_state import MatchBucketState
+from app.models.otp import OTP
+from app.models.pair_history import PairHistory
+from app.models.restaurant import Restaurant
+from app.models.revoked_token import RevokedToken
+from app.models.session import Session
+from app.models.subscription import Subscription
+from app.models.user import User
+from app.models.venue import Venue
+
+
+def hot_queries():
+    """(name, model, filter, sort) for every lookup on a request path or cron loop."""
+    now = datetime.now(timezone.utc)
+    some_id = PydanticObjectId()
+    email = "someone@example.com"
+    return [
+        ("auth: session by access token", Session, {"access_token": "token"}, None),
+        ("auth: session by refresh token", Session, {"refresh_token": "token"}, None),
+        ("auth: user by email", User, {"email": email}, None),
+        ("auth: admin by email", AdminUser, {"email": email}, None),
+        ("auth: revoked token by jti", RevokedToken, {"jti": "jti"}, None),
+        ("auth: revocations since last refresh", RevokedToken, {"revoked_at": {"$gte": now}}, None),
+        ("otp: by email", OTP, {"email": email}, None),
+        ("subscription: active for user", Subscription, {"user_email": email, "status": "active"}, None),
+        ("subscription: by stripe id", Subscription, {"stripe_subscription_id": "sub_123"}, None),
+        ("dinners: upcoming in city", Dinner,
+         {"city": "Delhi", "country": "India", "date": {"$gte": now}}, [("date", 1)]),
+        ("dinners: due for matching", Dinner,
+         {"matched": False, "date": {"$gte": now, "$lte": now + timedelta(hours=48)}}, [("date", 1)]),
+        ("dinners: opted in by user", Dinner, {"opted_in_users.user_id": some_id}, None),
+        ("groups: user's bookings", DinnerGroup, {"participant_ids": some_id}, None),
+        ("groups: user's group at a dinner", DinnerGroup, {"dinner_id": some_id, "participant_ids": some_id}, None),
+        ("groups: without venue", DinnerGroup, {"dinner_id": some_id, "venue_id": None}, None),
+        ("match jobs: active for dinner", MatchJob,
+         {"dinner_id": some_id, "status": {"$in": ACTIVE_JOB_STATUSES}}, None),
+        ("match runs: latest for dinner", MatchRun, {"dinner_id": some_id}, [("created_at", -1)]),
+        ("match runs: latest", MatchRun, {}, [("created_at", -1)]),
+        ("match states: dirty", MatchBucketState, {"dirty": True}, [("updated_at", 1)]),
+        ("pair history: bucket users", PairHistory, {"user_id": {"$in": [some_id]}}, None),
+        ("affinity: bucket users", AffinityPrior, {"user_id": {"$in": [some_id]}}, None),
+        ("feedback: recent", Feedback, {"submitted_at": {"$gte": now - timedelta(days=365)}}, None),
+        ("venues: active in city", Venue, {"city": "Delhi", "is_active": True}, None),
+        ("restaurants: active in city", Restaurant,
+         {"city": "Delhi", "is_active": True}, [("max_group_size", 1)]),
+    ]
+
+
+def plan_stages(plan: dict):
+    """Every stage name in a query plan tree."""
+    yield plan.get("stage")
+    for child in plan.get("inputStages", []) + [plan[key] for key in ("inputStage", "queryPlan") if key in plan]:
+        yield from plan_stages(child)
+
+
+async def collection_scans() -> List[str]:
+    """Explain every hot query; the names of those whose winning plan contains a COLLSCAN."""
+    await init_db()
+
+    scans = []
+    for name, model, query, sort in hot_queries():
+        cursor = model.get_motor_collection().find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = await cursor.explain()
+        stages = set(plan_stages(explained["queryPlanner"]["winningPlan"]))
+        if "COLLSCAN" in stages:
+            scans.append(name)
+            print(f"❌ {name}: COLLSCAN on {model.get_collection_name()} {query}")
+        else:
+            print(f"✅ {name}: {' > '.join(sorted(s for s in stages if s))}")
+    return scans
+
+
+async def explain_hot_queries() -> int:
+    scans = await collection_scans()
+    print(f"{len(hot_queries()) - len(scans)}/{len(hot_queries())} hot queries use an index")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(explain_hot_queries()))
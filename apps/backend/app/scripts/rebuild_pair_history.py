@@ -0,0 +1,51 @@
+"""
+Rebuild the co-dining pair history from every stored DinnerGroup.
+
+    python -m app.scripts.rebuild_pair_history
+
+Matching keeps the index up to date as groups are persisted; this is for the initial
+backfill, or to recover after the index was lost. The index is wiped first.
+"""
+import asyncio
+
+from app.db.init import init_db
+from app.models.dinner import Dinner, DinnerGroup, DinnerSchedule
+from app.models.pair_history import PairHistory
+from app.services.matchmaking.history import record_pair_history
+
+BATCH_SIZE = 500  # groups per bulk write
+
+
+async def rebuild_pair_history():
+    await init_db()
+
+    dinner_dates = {d.id: d.date for d in await Dinner.find_all().project(DinnerSchedule).to_list()}
+    await PairHistory.find_all().delete()
+
+    batch, groups_seen = [], 0
+    async for group in DinnerGroup.find_all():
+        dined_at = dinner_dates.get(group.dinner_id)
+        if dined_at is None:
+            continue
+        batch.append((group.participant_ids, dined_at))
+        if len(batch) >= BATCH_SIZE:
+            groups_seen += await _flush(batch)
+
+    groups_seen += await _flush(batch)
+    print(f"✅ Rebuilt pair history from {groups_seen} groups ({await PairHistory.count()} users)")
+
+
+async def _flush(batch) -> int:
+    count = len(batch)
+    # record_pair_history takes one date per call, so write each date's groups together
+    by_date = {}
+    for participant_ids, dined_at in batch:
+        by_date.setdefault(dined_at, []).append(participant_ids)
+    for dined_at, groups in by_date.items():
+        await record_pair_history(groups, dined_at=dined_at)
+    batch.clear()
+    return count
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_pair_history())
@@ -1,11 +1,20 @@
 # app/services/auth.py
 from app.models.session import Session
+from beanie.operators import Set
+from app.services.session import revoke_access_token
 from fastapi import HTTPException
+from datetime import datetime, timezone
 
 async def logout_user(refresh_token: str):
     session = await Session.find_one(Session.refresh_token == refresh_token)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session.is_active = False
-    await session.save()
+    # Only these two fields: a save() of the whole session could undo a refresh made meanwhile.
+    # Nothing is left to refresh, so expiring it now lets the TTL index remove it.
+    result = await Session.find_one(Session.id == session.id, Session.refresh_token == refresh_token).update(
+        Set({Session.is_active: False, Session.expires_at: datetime.now(timezone.utc)})
+    )
+    if result.modified_count != 1:
+        raise HTTPException(status_code=404, detail="Session not found")  # refreshed meanwhile
+    await revoke_access_token(session.access_token)
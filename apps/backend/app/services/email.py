@@ -1,9 +1,8 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
+from app.services.smtp_pool import smtp_pool
 from app.core.logger import logger  # If using your logger setup
-from smtplib import SMTP
 
 def send_otp_email(to_email: str, otp: str):
     try:
@@ -28,11 +27,8 @@ def send_otp_email(to_email: str, otp: str):
         """
         message.attach(MIMEText(body, "plain"))
 
-        # Connect to Gmail SMTP server
-        with smtplib.SMTP(settings.SMTP_SERVER, int(settings.SMTP_PORT)) as server:
-            server.starttls()
-            server.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
-            server.send_message(message)
+        # Send over a pooled, already logged-in connection
+        smtp_pool.send_message(message)
 
         logger.info(f"✅ OTP email sent to {to_email}")
 
@@ -62,10 +58,7 @@ def send_venue_update_email(to_email: str, name: str, venue_name: str, venue_add
         """
         message.attach(MIMEText(body, "plain"))
 
-        with smtplib.SMTP(settings.SMTP_SERVER, int(settings.SMTP_PORT)) as server:
-            server.starttls()
-            server.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
-            server.send_message(message)
+        smtp_pool.send_message(message)
 
         logger.info(f"✅ Venue update email sent to {to_email}")
     except Exception as e:
@@ -80,10 +73,7 @@ def send_email_raw(to_email: str, subject: str, body: str):
         message["To"] = to_email
         message.attach(MIMEText(body, "plain"))
 
-        with smtplib.SMTP(settings.SMTP_SERVER, int(settings.SMTP_PORT)) as server:
-            server.starttls()
-            server.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
-            server.send_message(message)
+        smtp_pool.send_message(message)
 
         logger.info(f"✅ Email sent to {to_email}")
     except Exception as e:
@@ -106,7 +96,4 @@ def send_subscription_email(to_email: str, status: str):
     message["From"] = settings.EMAIL_SENDER
     message["To"] = to_email
 
-    with SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-        server.starttls()
-        server.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
-        server.send_message(message)
+    smtp_pool.send_message(message)
@@ -0,0 +1,142 @@
+# app/services/matchmaking/affinity.py
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Hashable, List, Optional
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, Field
+from pymongo import ReplaceOne
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.affinity import AffinityPrior
+from app.models.dinner import DinnerGroup
+from app.models.feedback import Feedback
+from app.services.matchmaking.compatibility import PairPenalties
+
+RATING_SCALE = 4.0  # 1..5 ratings: centred values are divided by this to land in about [-1, 1]
+GROUP_BATCH = 1000  # dinner groups per $in query
+
+
+class _Rating(BaseModel):
+    user_id: PydanticObjectId
+    dinner_group_id: PydanticObjectId
+    rating: int
+
+
+class _GroupMembers(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    participant_ids: List[PydanticObjectId] = Field(default_factory=list)
+
+
+def _shrunk(total: float, count: int) -> float:
+    # Few ratings say little: pull the mean towards 0 with AFFINITY_SHRINKAGE pseudo-ratings
+    return total / (count + settings.AFFINITY_SHRINKAGE)
+
+
+async def aggregate_affinity_priors(now: Optional[datetime] = None) -> int:
+    """
+    Rebuild every AffinityPrior from the feedback of the last AFFINITY_WINDOW_DAYS.
+
+    Each rating is centred on the overall mean and on the rater's own leniency, then
+    credited to every other member of the rated group: per user (how tables with them
+    went) and per pair (rater and member). Pair values are shrunk towards the average
+    of the two users' values, so a single rating moves a pair only a little. Returns
+    the number of users with a prior; priors of users without recent feedback are removed.
+    """
+    now = now or datetime.now(timezone.utc)
+    # Mongo keeps milliseconds; truncate so this run's computed_at compares equal after the round trip
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    ratings = await Feedback.find(
+        Feedback.submitted_at >= now - timedelta(days=settings.AFFINITY_WINDOW_DAYS)
+    ).project(_Rating).to_list()
+    if not ratings:
+        await AffinityPrior.find_all().delete()
+        return 0
+
+    mean = sum(r.rating for r in ratings) / len(ratings)
+    given = defaultdict(list)
+    for r in ratings:
+        given[r.user_id].append(r.rating - mean)
+    rater_bias = {user_id: _shrunk(sum(values), len(values)) for user_id, values in given.items()}
+
+    group_ids = list({r.dinner_group_id for r in ratings})
+    members = {}
+    for start in range(0, len(group_ids), GROUP_BATCH):
+        groups = await DinnerGroup.find(In(DinnerGroup.id, group_ids[start:start + GROUP_BATCH])).project(
+            _GroupMembers
+        ).to_list()
+        members.update({group.id: group.participant_ids for group in groups})
+
+    user_totals = defaultdict(lambda: [0.0, 0])
+    pair_totals = defaultdict(lambda: [0.0, 0])
+    for r in ratings:
+        centred = (r.rating - mean - rater_bias[r.user_id]) / RATING_SCALE
+        for other in members.get(r.dinner_group_id, []):
+            if other == r.user_id:
+                continue
+            user_totals[other][0] += centred
+            user_totals[other][1] += 1
+            pair = (r.user_id, other) if str(r.user_id) < str(other) else (other, r.user_id)
+            pair_totals[pair][0] += centred
+            pair_totals[pair][1] += 1
+
+    affinity = {user_id: _shrunk(total, count) for user_id, (total, count) in user_totals.items()}
+    partners = defaultdict(dict)
+    for (a, b), (total, count) in pair_totals.items():
+        prior = (affinity.get(a, 0.0) + affinity.get(b, 0.0)) / 2
+        value = (total + settings.AFFINITY_SHRINKAGE * prior) / (count + settings.AFFINITY_SHRINKAGE)
+        if abs(value) >= settings.AFFINITY_MIN_PAIR_VALUE:
+            partners[a][str(b)] = round(value, 4)
+            partners[b][str(a)] = round(value, 4)
+
+    users = set(given) | set(affinity)
+    operations = [
+        ReplaceOne(
+            {"user_id": user_id},
+            {
+                "user_id": user_id,
+                "rater_bias": round(rater_bias.get(user_id, 0.0) / RATING_SCALE, 4),
+                "affinity": round(affinity.get(user_id, 0.0), 4),
+                "partners": partners.get(user_id, {}),
+                "ratings": len(given.get(user_id, [])),
+                "computed_at": now,
+            },
+            upsert=True,
+        )
+        for user_id in users
+    ]
+    await AffinityPrior.get_motor_collection().bulk_write(operations, ordered=False)
+    await AffinityPrior.find(AffinityPrior.computed_at < now).delete()
+
+    logger.info("⭐ Aggregated %d ratings into affinity priors for %d users (%d pairs)",
+                len(ratings), len(users), len(pair_totals))
+    return len(users)
+
+
+async def load_affinity_penalties(buckets: Dict[Hashable, List[PydanticObjectId]]) -> Dict[Hashable, PairPenalties]:
+    """
+    Feedback pair affinities within each bucket as pair penalties (negative = bonus),
+    over the positions in the bucket's user id list. One $in query for all buckets.
+    """
+    if settings.AFFINITY_WEIGHT <= 0:
+        return {}
+    user_ids = [user_id for ids in buckets.values() for user_id in ids]
+    priors = await AffinityPrior.find(
+        In(AffinityPrior.user_id, user_ids), {"partners": {"$ne": {}}}
+    ).to_list()
+    partners_by_user = {prior.user_id: prior.partners for prior in priors}
+
+    penalties = {}
+    for key, ids in buckets.items():
+        position = {str(user_id): row for row, user_id in enumerate(ids)}
+        bucket_penalties: PairPenalties = {}
+        for row, user_id in enumerate(ids):
+            for partner, value in partners_by_user.get(user_id, {}).items():
+                other = position.get(partner)
+                if other is not None and other != row:
+                    bucket_penalties.setdefault(row, {})[other] = -settings.AFFINITY_WEIGHT * value
+        if bucket_penalties:
+            penalties[key] = bucket_penalties
+    return penalties
@@ -0,0 +1,123 @@
+import random
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.matchmaking import v2
+from app.services.matchmaking.compatibility import PairPenalties, restrict_pair_penalties
+from app.services.matchmaking.constraints import GroupFeatures
+from app.services.matchmaking.sizing import resolve_group_sizes
+
+ENGINE_VERSION = "1.1"
+CLUSTER_SIZE = 300  # target users per k-means cluster
+KMEANS_ITERATIONS = 25
+SECONDS_PER_1K_USERS = 1.0  # default local-search budget, spread over the clusters
+_DISTANCE_CHUNK = 8192  # rows per distance block, bounds k-means memory at large n
+
+
+def _nearest_centroid(traits: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    labels = np.empty(traits.shape[0], dtype=np.int64)
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    for start in range(0, traits.shape[0], _DISTANCE_CHUNK):
+        chunk = traits[start:start + _DISTANCE_CHUNK]
+        # |x - c|^2 without the |x|^2 term, which is the same for every centroid
+        distances = centroid_norms[None, :] - 2 * chunk @ centroids.T
+        labels[start:start + len(chunk)] = distances.argmin(axis=1)
+    return labels
+
+
+def kmeans(traits: np.ndarray, k: int, seed: Optional[int] = None, iterations: int = KMEANS_ITERATIONS):
+    """Plain Lloyd's k-means on the trait vectors; returns (labels, centroids)."""
+    rng = np.random.default_rng(seed)
+    centroids = traits[rng.choice(traits.shape[0], size=k, replace=False)].copy()
+    labels = _nearest_centroid(traits, centroids)
+
+    for _ in range(iterations):
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, traits)
+        filled = counts > 0
+        # Empty clusters keep their old centroid
+        centroids[filled] = sums[filled] / counts[filled, None]
+
+        new_labels = _nearest_centroid(traits, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    return labels, centroids
+
+
+def _neighbour_chain(centroids: np.ndarray, occupied: List[int]) -> List[int]:
+    """Order clusters so each one is followed by its nearest not-yet-visited neighbour."""
+    remaining = list(occupied[1:])
+    chain = [occupied[0]]
+    while remaining:
+        last = centroids[chain[-1]]
+        distances = ((centroids[remaining] - last) ** 2).sum(axis=1)
+        chain.append(remaining.pop(int(distances.argmin())))
+    return chain
+
+
+def match_traits_into_groups(
+    traits: np.ndarray,
+    group_size: int = 6,
+    seed: Optional[int] = None,
+    cluster_size: int = CLUSTER_SIZE,
+    time_budget: Optional[float] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    pair_penalties: Optional[PairPenalties] = None,
+    group_features: Optional[GroupFeatures] = None,
+) -> List[List[int]]:
+    """
+    Cluster-then-match for very large buckets.
+
+    Users are split into k-means clusters of about `cluster_size` in trait space and the
+    v2 local search runs inside each cluster, so cost grows with the number of clusters
+    rather than with the square of the bucket. Clusters are visited along a
+    nearest-centroid chain and users a cluster cannot fit into full groups are carried
+    into the next, neighbouring cluster, so only the last cluster can leave anyone out.
+    Group sizes are planned per cluster (see plan_group_sizes).
+    """
+    n = traits.shape[0]
+    if time_budget is None:
+        time_budget = max(v2.DEFAULT_TIME_BUDGET, SECONDS_PER_1K_USERS * n / 1000)
+
+    k = n // cluster_size
+    if k < 2:
+        return v2.match_traits_into_groups(
+            traits, group_size=group_size, seed=seed, time_budget=time_budget, min_size=min_size, max_size=max_size,
+            pair_penalties=pair_penalties, group_features=group_features,
+        )
+
+    labels, centroids = kmeans(traits, k, seed=seed)
+    members = [np.flatnonzero(labels == c) for c in range(k)]
+    occupied = [c for c in range(k) if len(members[c])]
+
+    rng = random.Random(seed)
+    groups = []
+    carried = np.empty(0, dtype=np.int64)
+    for cluster in _neighbour_chain(centroids, occupied):
+        indices = np.concatenate([carried, members[cluster]])
+        if not resolve_group_sizes(len(indices), group_size, min_size, max_size):
+            carried = indices
+            continue
+
+        local_groups = v2.match_traits_into_groups(
+            traits[indices],
+            group_size=group_size,
+            seed=rng.randrange(2**32),
+            time_budget=time_budget * len(indices) / n,
+            min_size=min_size,
+            max_size=max_size,
+            pair_penalties=restrict_pair_penalties(pair_penalties, indices),
+            group_features=group_features.restrict(indices) if group_features is not None else None,
+        )
+        placed = np.zeros(len(indices), dtype=bool)
+        for group in local_groups:
+            placed[group] = True
+            groups.append([int(indices[i]) for i in group])
+        carried = indices[~placed]
+
+    return groups
@@ -0,0 +1,87 @@
+from itertools import combinations
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+# Order matters: personality_compatibility sums trait similarities in this order,
+# and the matrix below must add them up the same way to stay bit-compatible.
+TRAITS = ("O", "C", "E", "A", "N")
+
+
+def build_trait_matrix(score_dicts: Sequence[Optional[Dict[str, float]]]) -> np.ndarray:
+    """Load O/C/E/A/N scores into an (n, 5) float64 array, one row per user."""
+    traits = np.zeros((len(score_dicts), len(TRAITS)), dtype=np.float64)
+    for row, scores in enumerate(score_dicts):
+        if not scores:
+            continue
+        for col, trait in enumerate(TRAITS):
+            traits[row, col] = scores.get(trait, 0.0)
+    return traits
+
+
+def compatibility_matrix(traits: np.ndarray) -> np.ndarray:
+    """Pairwise personality_compatibility for every pair of rows in `traits`."""
+    total = np.zeros((traits.shape[0], traits.shape[0]), dtype=np.float64)
+    for col in range(traits.shape[1]):
+        column = traits[:, col]
+        # Accumulate trait by trait (not np.sum) so the float rounding matches
+        # the scalar loop in personality_compatibility exactly.
+        total += 1 - np.abs(column[:, None] - column[None, :])
+    return total / traits.shape[1]
+
+
+def group_score(matrix: np.ndarray, members: List[int]) -> float:
+    """Average pairwise compatibility of a group, read from the precomputed matrix."""
+    scores = [matrix.item(i, j) for i, j in combinations(members, 2)]
+    return float(sum(scores) / len(scores))
+
+
+# Sparse, symmetric penalty on pair compatibility: row -> {other row: penalty}; negative
+# values are bonuses. Only adjusted pairs have an entry, so lookups during a solve are O(1).
+PairPenalties = Dict[int, Dict[int, float]]
+
+
+def merge_pair_penalties(*sources: Dict[Hashable, PairPenalties]) -> Dict[Hashable, PairPenalties]:
+    """Add up per-bucket pair penalties from several sources (e.g. co-dining history and feedback)."""
+    merged: Dict[Hashable, PairPenalties] = {}
+    for source in sources:
+        for key, penalties in source.items():
+            bucket = merged.setdefault(key, {})
+            for i, row in penalties.items():
+                target = bucket.setdefault(i, {})
+                for j, penalty in row.items():
+                    target[j] = target.get(j, 0.0) + penalty
+    return merged
+
+
+def apply_pair_penalties(matrix: np.ndarray, penalties: Optional[PairPenalties]) -> np.ndarray:
+    """Subtract `penalties` from a pair matrix over the same rows, in place."""
+    for i, row in (penalties or {}).items():
+        for j, penalty in row.items():
+            matrix[i, j] -= penalty
+    return matrix
+
+
+def penalise_block(block: np.ndarray, members: Sequence[int], penalties: Optional[PairPenalties]) -> np.ndarray:
+    """Subtract `penalties` from a pair block whose rows and columns are `members`, in place."""
+    if penalties:
+        position = {member: k for k, member in enumerate(members)}
+        for k, member in enumerate(members):
+            for other, penalty in penalties.get(member, {}).items():
+                column = position.get(other)
+                if column is not None:
+                    block[k, column] -= penalty
+    return block
+
+
+def restrict_pair_penalties(penalties: Optional[PairPenalties], indices: Sequence[int]) -> Optional[PairPenalties]:
+    """Penalties among `indices` only, renumbered to positions in `indices`."""
+    if not penalties:
+        return None
+    position = {int(index): k for k, index in enumerate(indices)}
+    restricted = {}
+    for index, k in position.items():
+        row = {position[other]: penalty for other, penalty in penalties.get(index, {}).items() if other in position}
+        if row:
+            restricted[k] = row
+    return restricted or None
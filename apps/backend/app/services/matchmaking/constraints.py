@@ -0,0 +1,151 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+HARD_WEIGHT = 100.0  # per unit of violation; far above any compatibility gain, so hard limits come first
+AGE_UNIT_YEARS = 10.0  # soft age penalties are counted per this many years over the limit
+
+
+class GroupConstraints(BaseModel):
+    """Composition limits for every group. Hard limits are only broken when a bucket leaves no other way."""
+    max_same_gender: Optional[int] = None  # at most this many people of one gender per group
+    max_age_range: Optional[float] = None  # years between the oldest and youngest member
+    gender_hard: bool = True
+    age_hard: bool = False
+    soft_weight: float = 0.05  # compatibility points per unit of soft violation
+
+    @property
+    def active(self) -> bool:
+        return self.max_same_gender is not None or self.max_age_range is not None
+
+    @classmethod
+    def from_settings(cls) -> "GroupConstraints":
+        return cls(
+            max_same_gender=settings.MATCH_MAX_SAME_GENDER or None,
+            max_age_range=settings.MATCH_MAX_AGE_RANGE_YEARS or None,
+            gender_hard=settings.MATCH_GENDER_CONSTRAINT_HARD,
+            age_hard=settings.MATCH_AGE_CONSTRAINT_HARD,
+        )
+
+
+def _age_at(dob: Optional[date], on: datetime) -> float:
+    if not dob:
+        return np.nan
+    return on.year - dob.year - ((on.month, on.day) < (dob.month, dob.day))
+
+
+class GroupFeatures:
+    """
+    Per-user gender codes and ages of one bucket plus the constraints on them. Scores
+    whole groups for v1/exact and, for v2, the penalty change of every possible swap
+    between two groups at once from per-group counts.
+    """
+
+    def __init__(self, constraints: GroupConstraints, genders: np.ndarray, ages: np.ndarray):
+        self.constraints = constraints
+        self.genders = genders  # int codes, -1 = unknown
+        self.ages = ages  # years, NaN = unknown
+        self.gender_weight = HARD_WEIGHT if constraints.gender_hard else constraints.soft_weight
+        self.age_weight = (HARD_WEIGHT if constraints.age_hard else constraints.soft_weight) / AGE_UNIT_YEARS
+        # Hot-path forms: gender slot 0 = unknown, and unknown ages that never move a min/max
+        self._slots = genders + 1
+        self._slot_count = int(self._slots.max()) + 1 if len(genders) else 1
+        self._age_low = np.where(np.isnan(ages), np.inf, ages)
+        self._age_high = np.where(np.isnan(ages), -np.inf, ages)
+        self._slot_list = self._slots.tolist()
+        self._age_low_list, self._age_high_list = self._age_low.tolist(), self._age_high.tolist()
+
+    @classmethod
+    def from_users(cls, constraints: GroupConstraints, users: Sequence, on: datetime) -> "GroupFeatures":
+        """Features of `users` (anything with gender and dob) as of the dinner date `on`."""
+        codes: Dict[str, int] = {}
+        genders = np.full(len(users), -1, dtype=np.int64)
+        for row, user in enumerate(users):
+            gender = (user.gender or "").strip().lower()
+            if gender:
+                genders[row] = codes.setdefault(gender, len(codes))
+        ages = np.array([_age_at(u.dob, on) for u in users], dtype=np.float64)
+        return cls(constraints, genders, ages)
+
+    def restrict(self, indices: Sequence[int]) -> "GroupFeatures":
+        return GroupFeatures(self.constraints, self.genders[indices], self.ages[indices])
+
+    def violations(self, members: Sequence[int]):
+        """(people over the gender limit, years over the age limit) for one group."""
+        members = list(members)
+        gender_excess, age_excess = 0, 0.0
+        if self.constraints.max_same_gender is not None:
+            counts = np.bincount(self._slots[members], minlength=self._slot_count)[1:]
+            gender_excess = int(np.maximum(counts - self.constraints.max_same_gender, 0).sum())
+        if self.constraints.max_age_range is not None:
+            age_range = self._age_high[members].max() - self._age_low[members].min()  # -inf if all unknown
+            age_excess = max(float(age_range) - self.constraints.max_age_range, 0.0)
+        return gender_excess, age_excess
+
+    def penalty(self, members: Sequence[int]) -> float:
+        gender_excess, age_excess = self.violations(members)
+        return self.gender_weight * gender_excess + self.age_weight * age_excess
+
+    def _gender_cost(self, group: List[int], incoming: List[int]) -> Optional[np.ndarray]:
+        limit = self.constraints.max_same_gender
+        out = [self._slot_list[k] for k in group]
+        counts = [0] * self._slot_count
+        for slot in out:
+            counts[slot] += 1
+        counts[0] = 0  # unknown gender is never over the limit
+        if max(counts) < limit:
+            return None  # one more of any gender still fits
+        into = self._slots[incoming]
+        counts = np.array(counts)
+        added = (counts >= limit)[into].astype(float)  # one more of this gender adds a unit
+        removed = (counts > limit)[out].astype(float)  # one fewer removes a unit
+        return np.subtract.outer(added, removed).T * np.not_equal.outer(out, into)
+
+    def _age_cost(self, group: List[int], incoming: List[int]) -> Optional[np.ndarray]:
+        limit = self.constraints.max_age_range
+        # Groups are small, so the extremes are cheaper on plain lists than as array reductions
+        low = [self._age_low_list[k] for k in group]
+        high = [self._age_high_list[k] for k in group]
+        in_low = [self._age_low_list[k] for k in incoming]
+        in_high = [self._age_high_list[k] for k in incoming]
+        if max(max(high), max(in_high)) - min(min(low), min(in_low)) <= limit:
+            return None  # every mix of the two stays within the limit
+        # Youngest/oldest of the group without member i: only the extreme member itself sees the runner-up
+        by_low, by_high = sorted(low), sorted(high)
+        low_without = [by_low[0]] * len(group)
+        low_without[low.index(by_low[0])] = by_low[1]
+        high_without = [by_high[-1]] * len(group)
+        high_without[high.index(by_high[-1])] = by_high[-2]
+        new_range = np.maximum.outer(high_without, in_high) - np.minimum.outer(low_without, in_low)
+        old_excess = max(by_high[-1] - by_low[0] - limit, 0.0)
+        return np.maximum(new_range - limit, 0.0) - old_excess
+
+    def _side_cost(self, group: List[int], incoming: List[int]) -> Optional[np.ndarray]:
+        """Penalty change of `group` when group[i] is replaced by incoming[j], for every (i, j); None if 0."""
+        cost = None
+        if self.constraints.max_same_gender is not None:
+            gender = self._gender_cost(group, incoming)
+            if gender is not None:
+                cost = self.gender_weight * gender
+        if self.constraints.max_age_range is not None:
+            age = self._age_cost(group, incoming)
+            if age is not None:
+                cost = self.age_weight * age if cost is None else cost + self.age_weight * age
+        return cost
+
+    def swap_cost(self, group: List[int], other: List[int], other_is_group: bool):
+        """
+        Total penalty change for swapping group[i] with other[j] (0 when no swap can
+        matter); the leftover pool has no limits. Each side is a handful of array ops on
+        the two groups' gender counts and age extremes.
+        """
+        cost = self._side_cost(group, other)
+        if other_is_group:
+            reverse = self._side_cost(other, group)
+            if reverse is not None:
+                cost = reverse.T if cost is None else cost + reverse.T
+        return 0.0 if cost is None else cost
@@ -0,0 +1,21 @@
+from app.services.matchmaking import clustering, exact, v1, v2
+
+# Engines selectable per matching run: (traits, seed=..., min_size=..., max_size=..., pair_penalties=...,
+# group_features=...) -> groups of row indices.
+# These are what the process pool runs, so they must stay picklable top-level functions.
+MATCHMAKING_SOLVERS = {
+    "v1": v1.match_traits_into_groups,
+    "v2": v2.match_traits_into_groups,
+    "cluster": clustering.match_traits_into_groups,
+    "exact": exact.match_traits_into_groups,
+}
+
+ENGINE_VERSIONS = {
+    "v1": v1.ENGINE_VERSION,
+    "v2": v2.ENGINE_VERSION,
+    "cluster": clustering.ENGINE_VERSION,
+    "exact": exact.ENGINE_VERSION,
+}
+# Solvers that accept initial_groups and time_budget, so a provisional partition can seed them
+WARM_START_ENGINES = {"v2", "exact"}
+DEFAULT_ENGINE = "v1"
@@ -0,0 +1,172 @@
+import time
+from collections import Counter
+from itertools import combinations
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.matchmaking import v2
+from app.services.matchmaking.compatibility import (
+    PairPenalties,
+    apply_pair_penalties,
+    compatibility_matrix,
+)
+from app.services.matchmaking.constraints import GroupFeatures
+from app.services.matchmaking.sizing import resolve_group_sizes
+
+ENGINE_VERSION = "1.1"
+MAX_EXACT_USERS = 30  # larger buckets go straight to the heuristic
+DEFAULT_TIME_BUDGET = 2.0  # seconds per bucket before settling for the best partition found
+_EPS = 1e-12
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+def _pair_sum(rows: List[List[float]], members) -> float:
+    total = 0.0
+    for i, j in combinations(members, 2):
+        total += rows[i][j]
+    return total
+
+
+def _best_links(matrix: np.ndarray, remaining: List[int], sizes) -> np.ndarray:
+    """
+    Upper bound on each remaining user's share of the summed group averages: over the
+    sizes still to fill, the best of its strongest `size - 1` links to other remaining
+    users divided by size * (size - 1) (each pair is shared by both of its users).
+    """
+    links = max(sizes) - 1
+    sub = matrix[np.ix_(remaining, remaining)].copy()
+    np.fill_diagonal(sub, -np.inf)
+    top = -np.sort(-np.partition(sub, -links, axis=1)[:, -links:], axis=1)
+    cumulative = top.cumsum(axis=1)
+    return np.max([cumulative[:, size - 2] / (size * (size - 1)) for size in sizes], axis=0)
+
+
+def solve_exact(
+    matrix: np.ndarray,
+    incumbent: List[List[int]],
+    sizes: List[int],
+    deadline: float,
+    features: Optional[GroupFeatures] = None,
+) -> List[List[int]]:
+    """
+    Branch and bound over partitions of the rows of `matrix` into groups of the given
+    `sizes` (users beyond their total are left out), maximising the summed group average.
+
+    The lowest-numbered unassigned user always opens the next group, in any size still
+    to fill, or is left out, which removes the ordering symmetry between groups. A branch
+    is pruned when even giving every remaining user its strongest possible links cannot
+    beat the best partition so far (constraint penalties from `features` only lower a
+    group's value, so the bound stays valid). Starts from `incumbent` and raises
+    _BudgetExhausted past `deadline`.
+    """
+    n = matrix.shape[0]
+    rows = matrix.tolist()
+
+    def average(members) -> float:
+        size = len(members)
+        value = _pair_sum(rows, members) / (size * (size - 1) / 2)
+        return value - features.penalty(members) if features is not None else value
+
+    best = {"score": sum(average(g) for g in incumbent), "groups": [list(g) for g in incumbent]}
+    nodes = 0
+
+    def bound(tops: dict, members, skips: int) -> float:
+        # Only users that will actually sit in a group contribute, so drop the `skips` weakest
+        values = sorted(v for user, v in tops.items() if user not in members)
+        return sum(values[skips:])
+
+    def search(remaining: List[int], open_sizes: Counter, skips: int, total: float, groups: List[List[int]]):
+        nonlocal nodes
+        nodes += 1
+        if nodes % 256 == 0 and time.perf_counter() > deadline:
+            raise _BudgetExhausted
+
+        if not open_sizes:
+            if total > best["score"] + _EPS:
+                best["score"], best["groups"] = total, [list(g) for g in groups]
+            return
+
+        tops = dict(zip(remaining, _best_links(matrix, remaining, list(open_sizes)).tolist()))
+        if total + bound(tops, (), skips) <= best["score"] + _EPS:
+            return
+
+        first, rest = remaining[0], remaining[1:]
+        candidates = []
+        count = 0
+        for size in open_sizes:
+            for others in combinations(rest, size - 1):
+                count += 1
+                if count % 4096 == 0 and time.perf_counter() > deadline:
+                    raise _BudgetExhausted
+                members = (first,) + others
+                group_total = average(members)
+                upper = total + group_total + bound(tops, set(members), skips)
+                if upper > best["score"] + _EPS:
+                    candidates.append((group_total, upper, members))
+
+        # Most compatible groups first, so good partitions are found early and prune the rest
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for group_total, upper, members in candidates:
+            if upper <= best["score"] + _EPS:
+                continue
+            chosen = set(members)
+            open_sizes[len(members)] -= 1
+            groups.append(list(members))
+            search([r for r in rest if r not in chosen], +open_sizes, skips, total + group_total, groups)
+            groups.pop()
+            open_sizes[len(members)] += 1
+
+        if skips:
+            search(rest, open_sizes, skips - 1, total, groups)
+
+    try:
+        search(list(range(n)), Counter(sizes), n - sum(sizes), 0.0, [])
+    except _BudgetExhausted:
+        pass
+    return best["groups"]
+
+
+def match_traits_into_groups(
+    traits: np.ndarray,
+    group_size: int = 6,
+    seed: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    max_users: int = MAX_EXACT_USERS,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    initial_groups: Optional[List[List[int]]] = None,
+    pair_penalties: Optional[PairPenalties] = None,
+    group_features: Optional[GroupFeatures] = None,
+) -> List[List[int]]:
+    """
+    Optimal partition for small buckets, heuristic for the rest.
+
+    Buckets above `max_users` are handed to the v2 local search unchanged (with v2's own
+    default budget unless `time_budget` is given). Smaller ones are seeded with the v2
+    result and searched exactly; if `time_budget` (DEFAULT_TIME_BUDGET by default) runs
+    out first, the best partition found so far is returned, which is never worse than v2's.
+    `initial_groups` warm-starts v2 (see v2.match_traits_into_groups).
+    """
+    n = traits.shape[0]
+    sizes = resolve_group_sizes(n, group_size, min_size, max_size)
+    if n > max_users or not sizes:
+        return v2.match_traits_into_groups(
+            traits, group_size=group_size, seed=seed, min_size=min_size, max_size=max_size,
+            time_budget=v2.DEFAULT_TIME_BUDGET if time_budget is None else time_budget,
+            initial_groups=initial_groups, pair_penalties=pair_penalties, group_features=group_features,
+        )
+
+    if time_budget is None:
+        time_budget = DEFAULT_TIME_BUDGET
+    deadline = time.perf_counter() + time_budget
+    incumbent = v2.match_traits_into_groups(
+        traits, group_size=group_size, seed=seed, time_budget=time_budget / 4,
+        min_size=min_size, max_size=max_size, initial_groups=initial_groups, pair_penalties=pair_penalties,
+        group_features=group_features,
+    )
+    matrix = apply_pair_penalties(compatibility_matrix(traits), pair_penalties)
+    return solve_exact(matrix, incumbent, sizes, deadline, group_features)
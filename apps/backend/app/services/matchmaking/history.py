@@ -0,0 +1,87 @@
+# app/services/matchmaking/history.py
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.models.pair_history import PairHistory
+from app.services.matchmaking.compatibility import PairPenalties
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # Mongo hands datetimes back naive (in UTC)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+async def record_pair_history(
+    groups: Iterable[List[PydanticObjectId]], dined_at: datetime, newcomer: Optional[PydanticObjectId] = None
+):
+    """
+    Add every pair within `groups` to the co-dining index: one upsert per user, sent in
+    a single unordered bulk write. Counts go up by one and last_dined_at only moves forward.
+    With `newcomer` set, only that user's pairs are added (someone joining an existing group).
+    """
+    now = datetime.now(timezone.utc)
+    operations = []
+    for group in groups:
+        for user_id in group:
+            if newcomer is None or user_id == newcomer:
+                partners = [str(other) for other in group if other != user_id]
+            else:
+                partners = [str(newcomer)] if newcomer in group else []
+            if not partners:
+                continue
+            operations.append(UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$inc": {f"partners.{partner}.times": 1 for partner in partners},
+                    "$max": {f"partners.{partner}.last_dined_at": dined_at for partner in partners},
+                    "$set": {"updated_at": now},
+                },
+                upsert=True,
+            ))
+    if operations:
+        await PairHistory.get_motor_collection().bulk_write(operations, ordered=False)
+
+
+def pair_penalty(last_dined_at: datetime, now: datetime) -> float:
+    """Penalty for a pair that last dined together at `last_dined_at`, halving every half-life."""
+    age_days = max((now - _as_utc(last_dined_at)).total_seconds() / 86400, 0.0)
+    if age_days > settings.PAIR_HISTORY_WINDOW_DAYS:
+        return 0.0
+    return settings.PAIR_HISTORY_PENALTY * 0.5 ** (age_days / settings.PAIR_HISTORY_HALF_LIFE_DAYS)
+
+
+async def load_pair_penalties(
+    buckets: Dict[Hashable, List[PydanticObjectId]], now: Optional[datetime] = None
+) -> Dict[Hashable, PairPenalties]:
+    """
+    Co-dining penalties within each bucket, as sparse row -> {row: penalty} maps over the
+    positions in the bucket's user id list. One $in query for all buckets; buckets without
+    any repeat pairs are left out.
+    """
+    if settings.PAIR_HISTORY_PENALTY <= 0:
+        return {}
+    now = now or datetime.now(timezone.utc)
+    user_ids = [user_id for ids in buckets.values() for user_id in ids]
+    histories = await PairHistory.find(In(PairHistory.user_id, user_ids)).to_list()
+    partners_by_user = {history.user_id: history.partners for history in histories}
+
+    penalties = {}
+    for key, ids in buckets.items():
+        position = {str(user_id): row for row, user_id in enumerate(ids)}
+        bucket_penalties: PairPenalties = {}
+        for row, user_id in enumerate(ids):
+            for partner, seen in partners_by_user.get(user_id, {}).items():
+                other = position.get(partner)
+                if other is None or other == row:
+                    continue
+                penalty = pair_penalty(seen.last_dined_at, now)
+                if penalty > 0:
+                    bucket_penalties.setdefault(row, {})[other] = penalty
+        if bucket_penalties:
+            penalties[key] = bucket_penalties
+    return penalties
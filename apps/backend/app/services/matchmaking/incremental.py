@@ -0,0 +1,186 @@
+# app/services/matchmaking/incremental.py
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+from beanie import PydanticObjectId
+from beanie.operators import In, Inc, Push, Set, SetOnInsert
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.dinner import Dinner, DinnerGroup, DinnerOptInUser
+from app.models.match_job import MatchJob
+from app.models.match_state import MatchBucketState
+from app.models.user import User, UserMatchProfile
+from app.models.pair_history import PairHistory
+from app.models.affinity import AffinityPrior
+from app.services.matchmaking.affinity import load_affinity_penalties
+from app.services.matchmaking.compatibility import build_trait_matrix, merge_pair_penalties
+from app.services.matchmaking.history import load_pair_penalties, pair_penalty, record_pair_history
+from app.services.matchmaking.pool import get_executor, solve_bucket
+from app.services.matchmaking.sizing import plan_group_sizes, resolve_group_size_range
+from app.services.matchmaking.v1 import calculate_group_score, personality_compatibility
+
+IMPROVE_ENGINE = "v2"
+IMPROVE_TIME_BUDGET = 10.0  # seconds per bucket and pass; nobody is waiting on these
+IMPROVE_BATCH = 50  # buckets per pass
+
+
+async def record_opt_in(dinner: Dinner, opt_in: DinnerOptInUser, user: User):
+    """
+    Add a new opt-in to its bucket's matching state. A single upsert, so concurrent
+    opt-ins never overwrite each other. Users matching would skip (no personality
+    scores) are skipped here too.
+    """
+    if not user.personality_answers or not user.personality_scores:
+        return
+
+    # Plain dict, not model_dump(): that would store the ObjectId as a string
+    member = {"user_id": user.id, "traits": build_trait_matrix([user.personality_scores])[0].tolist()}
+    await MatchBucketState.find_one(
+        MatchBucketState.dinner_id == dinner.id,
+        MatchBucketState.budget_category == opt_in.budget_category,
+        MatchBucketState.dietary_category == opt_in.dietary_category,
+    ).update(
+        Push({MatchBucketState.members: member}),
+        Inc({MatchBucketState.members_version: 1}),
+        Set({MatchBucketState.dirty: True, MatchBucketState.updated_at: datetime.now(timezone.utc)}),
+        SetOnInsert({
+            MatchBucketState.dinner_id: dinner.id,
+            MatchBucketState.budget_category: opt_in.budget_category,
+            MatchBucketState.dietary_category: opt_in.dietary_category,
+            MatchBucketState.city: dinner.city,
+            MatchBucketState.groups: [],
+        }),
+        upsert=True,
+    )
+
+
+async def _improve_state(state: MatchBucketState):
+    min_size, max_size = await resolve_group_size_range(state.city)
+    ids = [member.user_id for member in state.members]
+    if not plan_group_sizes(len(ids), min_size, max_size):
+        groups = []
+    else:
+        index = {user_id: i for i, user_id in enumerate(ids)}
+        initial = [[index[user_id] for user_id in group if user_id in index] for group in state.groups]
+        traits = np.array([member.traits for member in state.members])
+        key = (state.budget_category, state.dietary_category)
+        penalties = merge_pair_penalties(
+            await load_pair_penalties({key: ids}), await load_affinity_penalties({key: ids})
+        ).get(key)
+        loop = asyncio.get_running_loop()
+        solved, seconds = await loop.run_in_executor(
+            get_executor(), solve_bucket, IMPROVE_ENGINE, traits, None, min_size, max_size,
+            initial or None, IMPROVE_TIME_BUDGET, penalties,
+        )
+        groups = [[ids[i] for i in group] for group in solved]
+        logger.info("🧩 Improved provisional groups for dinner %s %s/%s: %d users in %.2fs",
+                    state.dinner_id, state.budget_category, state.dietary_category, len(ids), seconds)
+
+    # Only mark clean if nobody opted in meanwhile; otherwise keep the (still valid) partition and stay dirty
+    result = await MatchBucketState.find_one(
+        MatchBucketState.id == state.id, MatchBucketState.members_version == state.members_version
+    ).update(Set({MatchBucketState.groups: groups, MatchBucketState.dirty: False}))
+    if result.modified_count != 1:
+        await MatchBucketState.find_one(MatchBucketState.id == state.id).update(
+            Set({MatchBucketState.groups: groups})
+        )
+
+
+async def improve_match_states(limit: int = IMPROVE_BATCH):
+    """One background pass: improve the provisional partition of every bucket that changed since the last pass."""
+    states = await MatchBucketState.find(MatchBucketState.dirty == True).sort(
+        +MatchBucketState.updated_at
+    ).limit(limit).to_list()
+    if not states:
+        return
+
+    results = await asyncio.gather(*(_improve_state(state) for state in states), return_exceptions=True)
+    for state, result in zip(states, results):
+        if isinstance(result, Exception):
+            logger.error("❌ Improving provisional groups for dinner %s failed: %s", state.dinner_id, result)
+
+
+async def load_provisional_groups(
+    dinner_id: PydanticObjectId, buckets: Dict[Hashable, list]
+) -> Dict[Hashable, List[List[int]]]:
+    """
+    Provisional partitions of a dinner's buckets as groups of row indices into each
+    bucket's user list, for warm-starting the final match. Buckets without one are left out.
+    """
+    states = await MatchBucketState.find(MatchBucketState.dinner_id == dinner_id).to_list()
+    provisional = {}
+    for state in states:
+        key = (state.budget_category, state.dietary_category)
+        if key not in buckets or not state.groups:
+            continue
+        index = {user.id: i for i, user in enumerate(buckets[key])}
+        provisional[key] = [[index[user_id] for user_id in group if user_id in index] for group in state.groups]
+    return provisional
+
+
+async def clear_match_states(dinner_id: PydanticObjectId):
+    await MatchBucketState.find(MatchBucketState.dinner_id == dinner_id).delete()
+
+
+async def slot_late_opt_in(dinner: Dinner, opt_in: DinnerOptInUser, user: User) -> Optional[DinnerGroup]:
+    """
+    Seat a user who opted in after the dinner was matched in the most compatible
+    under-filled group of their bucket, without re-matching the dinner. Returns the
+    group, or None if every group of the bucket is full.
+    """
+    if not user.personality_answers or not user.personality_scores:
+        return None
+
+    job = await MatchJob.get(PydanticObjectId(dinner.match_job_id)) if dinner.match_job_id else None
+    max_size = job.max_group_size if job and job.max_group_size else (await resolve_group_size_range(dinner.city))[1]
+
+    # A group with a participant at position max_size - 1 is full
+    not_full = {f"participant_ids.{max_size - 1}": {"$exists": False}}
+    groups = await DinnerGroup.find(
+        DinnerGroup.dinner_id == dinner.id,
+        DinnerGroup.budget_category == opt_in.budget_category,
+        DinnerGroup.dietary_category == opt_in.dietary_category,
+        not_full,
+    ).to_list()
+    if not groups:
+        return None
+
+    profiles = await User.find(
+        In(User.id, [pid for group in groups for pid in group.participant_ids])
+    ).project(UserMatchProfile).to_list()
+    profiles_by_id = {profile.id: profile for profile in profiles}
+    history = await PairHistory.find_one(PairHistory.user_id == user.id)
+    prior = await AffinityPrior.find_one(AffinityPrior.user_id == user.id)
+    now = datetime.now(timezone.utc)
+
+    def link(member) -> float:
+        seen = history.partners.get(str(member.id)) if history else None
+        penalty = pair_penalty(seen.last_dined_at, now) if seen else 0.0
+        if prior:
+            penalty -= settings.AFFINITY_WEIGHT * prior.partners.get(str(member.id), 0.0)
+        return personality_compatibility(user.personality_scores, member.personality_scores) - penalty
+
+    def affinity(group: DinnerGroup) -> float:
+        members = [profiles_by_id[pid] for pid in group.participant_ids if pid in profiles_by_id]
+        if not members:
+            return 0.0
+        return sum(link(m) for m in members) / len(members)
+
+    # Most compatible first, smaller groups first on ties; the next candidate is tried if one fills up meanwhile
+    for group in sorted(groups, key=lambda g: (-affinity(g), len(g.participant_ids))):
+        members = [profiles_by_id[pid] for pid in group.participant_ids if pid in profiles_by_id]
+        match_score = calculate_group_score(members + [user]) if members else group.match_score
+        result = await DinnerGroup.find_one(
+            DinnerGroup.id == group.id, DinnerGroup.participant_ids != user.id, not_full
+        ).update(Push({DinnerGroup.participant_ids: user.id}), Set({DinnerGroup.match_score: match_score}))
+        if result.modified_count == 1:
+            group.participant_ids.append(user.id)
+            group.match_score = match_score
+            await record_pair_history([group.participant_ids], dined_at=dinner.date, newcomer=user.id)
+            logger.info("🪑 Late opt-in %s seated in group %s of dinner %s", user.id, group.id, dinner.id)
+            return group
+    return None
@@ -0,0 +1,472 @@
+# app/services/matchmaking/jobs.py
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from async_lru import alru_cache
+from beanie import PydanticObjectId
+from beanie.operators import In
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.dinner import Dinner, DinnerGroup
+from app.models.match_job import ACTIVE_JOB_STATUSES, MatchJob, MatchJobBucket
+from app.models.match_run import MatchRun, MatchRunBucket
+from app.models.user import User, UserMatchProfile
+from app.services.matchmaking.affinity import load_affinity_penalties
+from app.services.matchmaking.compatibility import build_trait_matrix, merge_pair_penalties
+from app.services.matchmaking.constraints import GroupConstraints, GroupFeatures
+from app.services.matchmaking.engines import ENGINE_VERSIONS, WARM_START_ENGINES
+from app.services.matchmaking.history import load_pair_penalties, record_pair_history
+from app.services.matchmaking.incremental import clear_match_states, load_provisional_groups
+from app.services.matchmaking.persistence import persist_match_run
+from app.services.matchmaking.pool import solve_buckets
+from app.services.matchmaking.sizing import plan_group_sizes, resolve_group_size_range
+from app.services.matchmaking.v1 import calculate_group_score, group_users_by_preferences
+
+# A queued/running job that has not reported progress for this long is treated as dead
+# (e.g. its worker was restarted) and no longer blocks new submissions for the dinner.
+JOB_STALE_AFTER = timedelta(minutes=15)
+
+SCORE_PERCENTILES = (0, 10, 25, 50, 75, 90, 100)
+PREVIEW_CACHE_SIZE = 16  # dinners whose loaded inputs dry runs keep around
+
+# Dinners with a job running in this process -> its task (None while the submission is in flight)
+_running: Dict[PydanticObjectId, Optional[asyncio.Task]] = {}
+
+
+async def _save(job: MatchJob):
+    job.updated_at = datetime.now(timezone.utc)
+    await job.save()
+
+
+class _PhaseTimer:
+    """Moves the job through its phases and records how long each one took."""
+
+    def __init__(self, job: MatchJob):
+        self.job = job
+        self.started = None
+
+    async def enter(self, phase: str):
+        self.stop()
+        self.job.phase = phase
+        self.started = time.perf_counter()
+        await _save(self.job)
+
+    def stop(self):
+        if self.started is not None:
+            self.job.timings[self.job.phase] = round(time.perf_counter() - self.started, 4)
+            self.started = None
+
+
+def _score_stats(scores: List[float]):
+    """10-bin histogram over [0, 1] and percentiles of the group match scores."""
+    if not scores:
+        return [], {}
+    histogram, _ = np.histogram(scores, bins=10, range=(0.0, 1.0))
+    percentiles = np.percentile(scores, SCORE_PERCENTILES)
+    return histogram.tolist(), {f"p{p}": round(float(v), 6) for p, v in zip(SCORE_PERCENTILES, percentiles)}
+
+
+class DinnerInputs:
+    """
+    Everything matching reads for one dinner, split into preference buckets: the users
+    with scores, their trait arrays, pair penalties and gender/age features. Independent
+    of engine, seed and group sizes, so dry runs can reuse it.
+    """
+
+    def __init__(self, dinner: Dinner, constraints: GroupConstraints, opted_in: List[PydanticObjectId],
+                 buckets: Dict, traits: Dict, pair_penalties: Dict, group_features: Dict):
+        self.dinner = dinner
+        self.constraints = constraints
+        self.opted_in = opted_in
+        self.buckets = buckets  # (budget, dietary) -> [UserMatchProfile]
+        self.traits = traits  # (budget, dietary) -> (n, 5) trait array
+        self.pair_penalties = pair_penalties
+        self.group_features = group_features
+
+    @property
+    def candidates(self) -> int:
+        return sum(len(user_list) for user_list in self.buckets.values())
+
+
+async def load_dinner_inputs(dinner: Dinner) -> DinnerInputs:
+    """Load and bucket the dinner's opted-in users with scores, with their penalties and features."""
+    constraints = GroupConstraints.from_settings()
+
+    # One $in query for every opt-in, projected down to what matching reads
+    profiles = await User.find(
+        In(User.id, [opt_in.user_id for opt_in in dinner.opted_in_users]),
+        {"personality_answers.0": {"$exists": True}, "personality_scores": {"$nin": [None, {}]}},
+    ).project(UserMatchProfile).to_list()
+    profiles_by_id = {profile.id: profile for profile in profiles}
+
+    user_map = {}
+    for opt_in in dinner.opted_in_users:
+        user = profiles_by_id.get(opt_in.user_id)
+        if user:
+            user_map[user.id] = {
+                "user": user,
+                "budget_category": opt_in.budget_category,
+                "dietary_category": opt_in.dietary_category
+            }
+
+    preference_groups = dict(group_users_by_preferences(user_map))
+    logger.info("Preference groups for dinner %s: %s", dinner.id,
+                {key: len(user_list) for key, user_list in preference_groups.items()})
+
+    # Who already dined with whom, so regulars don't keep landing at the same table,
+    # and which pairs' past tables went unusually well or badly
+    bucket_ids = {key: [u.id for u in user_list] for key, user_list in preference_groups.items()}
+    pair_penalties = merge_pair_penalties(
+        await load_pair_penalties(bucket_ids), await load_affinity_penalties(bucket_ids)
+    ) if user_map else {}
+    # Gender/age features per bucket, so engines can score group composition from counts
+    group_features = {
+        key: GroupFeatures.from_users(constraints, user_list, dinner.date)
+        for key, user_list in preference_groups.items()
+    } if constraints.active else {}
+
+    return DinnerInputs(
+        dinner,
+        constraints,
+        opted_in=list(dict.fromkeys(opt_in.user_id for opt_in in dinner.opted_in_users)),
+        buckets=preference_groups,
+        traits={
+            key: build_trait_matrix([u.personality_scores for u in user_list])
+            for key, user_list in preference_groups.items()
+        },
+        pair_penalties=pair_penalties,
+        group_features=group_features,
+    )
+
+
+@alru_cache(maxsize=PREVIEW_CACHE_SIZE, ttl=settings.MATCH_PREVIEW_CACHE_SECONDS)
+async def _cached_dinner_inputs(dinner_id: PydanticObjectId, opt_ins: int) -> DinnerInputs:
+    # Keyed on the opt-in count as well, so a new opt-in is seen before the TTL runs out
+    return await load_dinner_inputs(await Dinner.get(dinner_id))
+
+
+def _count_violations(inputs: DinnerInputs, bucket_groups: Dict) -> Dict[str, int]:
+    """Groups over the gender and age limits (hard limits only when a bucket left no other way)."""
+    if not inputs.constraints.active:
+        return {}
+    violations = {"gender": 0, "age": 0}
+    for key, groups in bucket_groups.items():
+        for group in groups:
+            gender_excess, age_excess = inputs.group_features[key].violations(group)
+            violations["gender"] += gender_excess > 0
+            violations["age"] += age_excess > 0
+    return violations
+
+
+async def run_dinner_matching(job: MatchJob, run: MatchRun) -> dict:
+    """Load, bucket, solve and persist one dinner, reporting progress on `job` and metrics on `run`."""
+    timer = _PhaseTimer(job)
+
+    await timer.enter("loading")
+    dinner = await Dinner.get(job.dinner_id)
+    if not dinner or dinner.matched:
+        raise HTTPException(status_code=404, detail="Dinner not found or already matched")
+
+    min_size, max_size = await resolve_group_size_range(dinner.city, job.min_group_size, job.max_group_size)
+    job.min_group_size = run.min_group_size = min_size
+    job.max_group_size = run.max_group_size = max_size
+
+    def seatable(count: int) -> bool:
+        return bool(plan_group_sizes(count, min_size, max_size))
+
+    inputs = await load_dinner_inputs(dinner)
+    job.constraints = run.constraints = inputs.constraints.model_dump()
+
+    run.opted_in_users = len(inputs.opted_in)
+    run.candidate_users = inputs.candidates
+    run.ungrouped_reasons["missing_scores"] = len(inputs.opted_in) - inputs.candidates
+
+    if not seatable(inputs.candidates):
+        timer.stop()
+        run.ungrouped_reasons["bucket_too_small"] = inputs.candidates
+        return {
+            "dinner_id": str(dinner.id),
+            "status": "skipped",
+            "reason": f"Only {inputs.candidates} valid users"
+        }
+
+    await timer.enter("bucketing")
+    job.buckets = [
+        MatchJobBucket(
+            budget_category=budget,
+            dietary_category=dietary,
+            users=len(user_list),
+            # Not enough users for a group
+            status="pending" if seatable(len(user_list)) else "skipped",
+        )
+        for (budget, dietary), user_list in inputs.buckets.items()
+    ]
+    buckets = {key: user_list for key, user_list in inputs.buckets.items() if seatable(len(user_list))}
+    # Positions, not objects: save() re-parses the document and replaces the bucket models
+    positions = {(b.budget_category, b.dietary_category): i for i, b in enumerate(job.buckets)}
+
+    # Start from the partitions kept up to date since opt-in, so solving only has to polish them
+    provisional = await load_provisional_groups(dinner.id, buckets) if job.engine in WARM_START_ENGINES else {}
+    for key in provisional:
+        job.buckets[positions[key]].warm_started = True
+
+    async def on_solved(key, groups, seconds):
+        bucket = job.buckets[positions[key]]
+        bucket.status = "solved"
+        bucket.groups = len(groups)
+        bucket.solve_seconds = round(seconds, 4)
+        await _save(job)
+
+    # CPU-bound solving runs on the process pool, all buckets at once
+    await timer.enter("solving")
+    bucket_groups = await solve_buckets(
+        job.engine,
+        {key: inputs.traits[key] for key in buckets},
+        seed=job.seed,
+        on_solved=on_solved,
+        min_size=min_size,
+        max_size=max_size,
+        initial_groups=provisional,
+        warm_time_budget=settings.MATCHMAKING_WARM_TIME_BUDGET,
+        pair_penalties=inputs.pair_penalties,
+        group_features=inputs.group_features,
+    )
+
+    await timer.enter("persisting")
+    matched_groups = []
+    dinner_groups = []
+    scores = []
+    for (budget, dietary), user_list in buckets.items():
+        new_groups = [[user_list[i] for i in group] for group in bucket_groups[(budget, dietary)]]
+        matched_groups.extend(new_groups)  # accumulate all matched groups
+        for group in new_groups:
+            match_score = calculate_group_score(group)
+            scores.append(match_score)
+
+            dinner_groups.append(DinnerGroup(
+                dinner_id=dinner.id,
+                participant_ids=[u.id for u in group],
+                venue_id=None,
+                budget_category=budget,
+                dietary_category=dietary,
+                match_score=match_score
+            ))
+
+    # All groups and the matched flag in one go (one insert_many, transactional when possible)
+    await persist_match_run(dinner.id, dinner_groups, job_id=str(job.id))
+    await clear_match_states(dinner.id)
+    await record_pair_history([group.participant_ids for group in dinner_groups], dined_at=dinner.date)
+    timer.stop()
+
+    too_small = sum(len(user_list) for user_list in inputs.buckets.values() if not seatable(len(user_list)))
+    grouped = sum(len(group) for group in matched_groups)
+    run.ungrouped_reasons["bucket_too_small"] = too_small
+    run.ungrouped_reasons["leftover"] = inputs.candidates - too_small - grouped
+    run.groups_created = len(matched_groups)
+    run.constraint_violations = _count_violations(inputs, bucket_groups)
+    grouped_per_bucket = {key: sum(len(group) for group in groups) for key, groups in bucket_groups.items()}
+    run.buckets = [
+        MatchRunBucket(
+            budget_category=bucket.budget_category,
+            dietary_category=bucket.dietary_category,
+            users=bucket.users,
+            groups=bucket.groups,
+            ungrouped=bucket.users - grouped_per_bucket.get((bucket.budget_category, bucket.dietary_category), 0),
+            warm_started=bucket.warm_started,
+            solve_seconds=bucket.solve_seconds,
+        )
+        for bucket in job.buckets
+    ]
+    run.score_histogram, run.score_percentiles = _score_stats(scores)
+
+    return {
+        "dinner_id": str(dinner.id),
+        "groups_created": len(matched_groups),
+        "ungrouped_users": inputs.candidates - grouped,
+        "engine": job.engine,
+        "status": "matched"
+    }
+
+
+async def preview_dinner_matching(
+    dinner_id: PydanticObjectId,
+    engine: str,
+    seed: Optional[int] = None,
+    min_group_size: Optional[int] = None,
+    max_group_size: Optional[int] = None,
+) -> dict:
+    """
+    Dry run: everything run_dinner_matching does short of persisting. Reports the groups
+    that would be formed, their score distribution and who would be left out (and why).
+    The dinner's loaded inputs are cached for MATCH_PREVIEW_CACHE_SECONDS, so previews
+    with other engines, seeds or sizes only pay for solving.
+    """
+    dinner = await Dinner.get(dinner_id)
+    if not dinner or dinner.matched:
+        raise HTTPException(status_code=404, detail="Dinner not found or already matched")
+    timings = {}
+
+    started = time.perf_counter()
+    min_size, max_size = await resolve_group_size_range(dinner.city, min_group_size, max_group_size)
+    inputs = await _cached_dinner_inputs(dinner.id, len(dinner.opted_in_users))
+    buckets = {
+        key: user_list for key, user_list in inputs.buckets.items()
+        if plan_group_sizes(len(user_list), min_size, max_size)
+    }
+    provisional = await load_provisional_groups(dinner.id, buckets) if engine in WARM_START_ENGINES else {}
+    timings["loading"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    bucket_groups = await solve_buckets(
+        engine,
+        {key: inputs.traits[key] for key in buckets},
+        seed=seed,
+        min_size=min_size,
+        max_size=max_size,
+        initial_groups=provisional,
+        warm_time_budget=settings.MATCHMAKING_WARM_TIME_BUDGET,
+        pair_penalties=inputs.pair_penalties,
+        group_features=inputs.group_features,
+    )
+    timings["solving"] = round(time.perf_counter() - started, 4)
+
+    scores, group_sizes, ungrouped = [], Counter(), []
+    candidates = set()
+    for key, user_list in inputs.buckets.items():
+        candidates.update(u.id for u in user_list)
+        placed = set()
+        for group in bucket_groups.get(key, []):
+            scores.append(calculate_group_score([user_list[i] for i in group]))
+            group_sizes[len(group)] += 1
+            placed.update(group)
+        reason = "leftover" if key in buckets else "bucket_too_small"
+        ungrouped.extend(
+            {"user_id": str(u.id), "reason": reason} for i, u in enumerate(user_list) if i not in placed
+        )
+    ungrouped.extend(
+        {"user_id": str(user_id), "reason": "missing_scores"} for user_id in inputs.opted_in if user_id not in candidates
+    )
+    histogram, percentiles = _score_stats(scores)
+
+    return {
+        "dinner_id": str(dinner.id),
+        "engine": engine,
+        "engine_version": ENGINE_VERSIONS[engine],
+        "seed": seed,
+        "min_group_size": min_size,
+        "max_group_size": max_size,
+        "opted_in_users": len(inputs.opted_in),
+        "groups": len(scores),
+        "group_sizes": {str(size): count for size, count in sorted(group_sizes.items())},
+        "score_histogram": histogram,
+        "score_percentiles": percentiles,
+        "constraint_violations": _count_violations(inputs, bucket_groups),
+        "ungrouped_reasons": dict(Counter(entry["reason"] for entry in ungrouped)),
+        "ungrouped_users": ungrouped,
+        "timings": timings,
+    }
+
+
+async def _run_job(job: MatchJob):
+    job.status = "running"
+    job.started_at = datetime.now(timezone.utc)
+    await _save(job)
+
+    run = MatchRun(
+        dinner_id=job.dinner_id,
+        job_id=job.id,
+        engine=job.engine,
+        engine_version=ENGINE_VERSIONS[job.engine],
+        seed=job.seed,
+        status="running",
+    )
+
+    try:
+        job.summary = await run_dinner_matching(job, run)
+        job.status = "completed" if job.summary["status"] == "matched" else "skipped"
+    except HTTPException as e:
+        job.status = "failed"
+        job.error = e.detail
+    except Exception as e:
+        logger.exception("Matching job %s failed", job.id)
+        job.status = "failed"
+        job.error = str(e)
+
+    job.finished_at = datetime.now(timezone.utc)
+    await _save(job)
+
+    run.status = job.status
+    run.error = job.error
+    run.timings = dict(job.timings)
+    run.load_seconds = job.timings.get("loading")
+    run.persist_seconds = job.timings.get("persisting")
+    try:
+        await run.insert()
+    except Exception:
+        logger.exception("Could not record MatchRun for job %s", job.id)
+
+
+async def submit_match_job(
+    dinner_id: PydanticObjectId,
+    engine: str,
+    seed: Optional[int] = None,
+    min_group_size: Optional[int] = None,
+    max_group_size: Optional[int] = None,
+) -> MatchJob:
+    """
+    Queue a background matching run for a dinner and return its job immediately.
+    Rejects the submission if the dinner is unknown, already matched, or already being matched.
+    Group size bounds left unset are resolved when the job starts (see resolve_group_size_range).
+    """
+    bounds = [size for size in (min_group_size, max_group_size) if size is not None]
+    if any(size < 2 for size in bounds) or bounds != sorted(bounds):
+        raise HTTPException(status_code=400, detail=f"Invalid group size range {min_group_size}-{max_group_size}")
+
+    if dinner_id in _running:
+        raise HTTPException(status_code=409, detail="Matching is already running for this dinner")
+    _running[dinner_id] = None  # reserve before the first await so concurrent submits can't slip through
+
+    try:
+        if not await Dinner.find(Dinner.id == dinner_id, Dinner.matched == False).count():
+            raise HTTPException(status_code=404, detail="Dinner not found or already matched")
+
+        # Another API worker may own a run for this dinner
+        active = await MatchJob.find_one(
+            MatchJob.dinner_id == dinner_id,
+            In(MatchJob.status, ACTIVE_JOB_STATUSES),
+            MatchJob.updated_at > datetime.now(timezone.utc) - JOB_STALE_AFTER,
+        )
+        if active:
+            raise HTTPException(status_code=409, detail=f"Matching is already running for this dinner (job {active.id})")
+
+        job = MatchJob(
+            dinner_id=dinner_id,
+            engine=engine,
+            seed=seed,
+            min_group_size=min_group_size,
+            max_group_size=max_group_size,
+        )
+        await job.insert()
+    except BaseException:
+        _running.pop(dinner_id, None)
+        raise
+
+    task = asyncio.create_task(_run_job(job))
+    _running[dinner_id] = task
+    task.add_done_callback(lambda _: _running.pop(dinner_id, None))
+    return job
+
+
+async def wait_for_match_job(job: MatchJob) -> MatchJob:
+    """Wait for a job submitted from this process to finish and return its final state."""
+    task = _running.get(job.dinner_id)
+    if task:
+        await asyncio.shield(task)  # the caller giving up must not cancel the run itself
+    return await MatchJob.get(job.id)
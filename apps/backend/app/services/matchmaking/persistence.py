@@ -0,0 +1,69 @@
+# app/services/matchmaking/persistence.py
+from typing import List, Optional
+
+from beanie import PydanticObjectId
+from beanie.operators import Set
+from fastapi import HTTPException
+
+from app.core.logger import logger
+from app.models.dinner import Dinner, DinnerGroup
+
+_supports_transactions: Optional[bool] = None
+
+
+async def transactions_supported() -> bool:
+    """Multi-document transactions need a replica set or a sharded cluster (mongos)."""
+    global _supports_transactions
+    if _supports_transactions is None:
+        client = Dinner.get_motor_collection().database.client
+        hello = await client.admin.command("hello")
+        _supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _supports_transactions
+
+
+async def _write_groups(dinner_id: PydanticObjectId, groups: List[DinnerGroup], job_id: str, session=None) -> bool:
+    if groups:
+        await DinnerGroup.insert_many(groups, session=session)
+
+    # A dinner with a job id was matched, even if something later wrote matched back to False
+    result = await Dinner.find_one(
+        Dinner.id == dinner_id, Dinner.matched == False, Dinner.match_job_id == None, session=session
+    ).update(
+        Set({Dinner.matched: True, Dinner.match_job_id: job_id}), session=session
+    )
+    if result.modified_count != 1:
+        return False
+
+    # This job owns the dinner now: anything else stored for it was left by an
+    # interrupted or losing job and was never visible as a match.
+    await DinnerGroup.find(
+        DinnerGroup.dinner_id == dinner_id, DinnerGroup.match_job_id != job_id, session=session
+    ).delete(session=session)
+    return True
+
+
+async def persist_match_run(dinner_id: PydanticObjectId, groups: List[DinnerGroup], job_id: str):
+    """
+    Store every group of a matching run together with the dinner's matched flag.
+
+    Inside a transaction when the deployment supports one. Otherwise groups are tagged
+    with `job_id`, the MatchJob that computed them, and written in one insert_many, then
+    the dinner is flipped to matched only if it is still unmatched. The winning job clears
+    groups from other jobs; a job that loses the race removes its own, so re-running after
+    a crash never duplicates.
+    """
+    for group in groups:
+        group.match_job_id = job_id
+
+    if await transactions_supported():
+        client = Dinner.get_motor_collection().database.client
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                if not await _write_groups(dinner_id, groups, job_id, session=session):
+                    raise HTTPException(status_code=409, detail="Dinner was matched by another run")
+        return
+
+    if not await _write_groups(dinner_id, groups, job_id):
+        await DinnerGroup.find(DinnerGroup.dinner_id == dinner_id, DinnerGroup.match_job_id == job_id).delete()
+        raise HTTPException(status_code=409, detail="Dinner was matched by another run")
+    logger.info("Persisted %d groups for dinner %s without a transaction (job %s)", len(groups), dinner_id, job_id)
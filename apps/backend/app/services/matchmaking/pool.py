@@ -0,0 +1,97 @@
+# app/services/matchmaking/pool.py
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.matchmaking.compatibility import PairPenalties
+from app.services.matchmaking.constraints import GroupFeatures
+from app.services.matchmaking.engines import MATCHMAKING_SOLVERS
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        workers = settings.MATCHMAKING_WORKERS or os.cpu_count() or 1
+        # spawn, not fork: the API process holds Motor/event-loop threads that must not be cloned
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def solve_bucket(
+    engine: str,
+    traits: np.ndarray,
+    seed: Optional[int] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    initial_groups: Optional[List[List[int]]] = None,
+    time_budget: Optional[float] = None,
+    pair_penalties: Optional[PairPenalties] = None,
+    group_features: Optional[GroupFeatures] = None,
+) -> Tuple[List[List[int]], float]:
+    """
+    Runs inside a worker process: trait array in, groups of row indices and solve seconds out.
+    `initial_groups` and `time_budget` are only passed on when set (warm-start engines only).
+    """
+    options = {"pair_penalties": pair_penalties, "group_features": group_features}
+    if initial_groups is not None:
+        options["initial_groups"] = initial_groups
+    if time_budget is not None:
+        options["time_budget"] = time_budget
+
+    started = time.perf_counter()
+    groups = MATCHMAKING_SOLVERS[engine](traits, seed=seed, min_size=min_size, max_size=max_size, **options)
+    return groups, time.perf_counter() - started
+
+
+async def solve_buckets(
+    engine: str,
+    buckets: Dict[Hashable, np.ndarray],
+    seed: Optional[int] = None,
+    on_solved: Optional[Callable[[Hashable, List[List[int]], float], Awaitable[None]]] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    initial_groups: Optional[Dict[Hashable, List[List[int]]]] = None,
+    warm_time_budget: Optional[float] = None,
+    pair_penalties: Optional[Dict[Hashable, PairPenalties]] = None,
+    group_features: Optional[Dict[Hashable, GroupFeatures]] = None,
+) -> Dict[Hashable, List[List[int]]]:
+    """
+    Solve every preference bucket in parallel on the process pool without blocking the event loop.
+    `on_solved(key, groups, seconds)` is awaited as each bucket finishes, for progress reporting.
+    `min_size`/`max_size` bound the group sizes; unset means fixed groups of the engine's default size.
+    Buckets with an entry in `initial_groups` are warm-started from it and get `warm_time_budget`.
+    `pair_penalties` holds each bucket's co-dining penalties and `group_features` its
+    gender/age constraints, if any.
+    """
+    initial_groups = initial_groups or {}
+    pair_penalties = pair_penalties or {}
+    group_features = group_features or {}
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+
+    async def _solve(key):
+        warm = initial_groups.get(key)
+        groups, seconds = await loop.run_in_executor(
+            executor, solve_bucket, engine, buckets[key], seed, min_size, max_size,
+            warm, warm_time_budget if warm is not None else None, pair_penalties.get(key), group_features.get(key),
+        )
+        if on_solved:
+            await on_solved(key, groups, seconds)
+        return key, groups
+
+    return dict(await asyncio.gather(*(_solve(key) for key in buckets)))
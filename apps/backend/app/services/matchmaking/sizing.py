@@ -0,0 +1,69 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models.restaurant import Restaurant
+
+DEFAULT_GROUP_SIZE = 6
+
+
+def plan_group_sizes(
+    n: int,
+    min_size: int = DEFAULT_GROUP_SIZE,
+    max_size: int = DEFAULT_GROUP_SIZE,
+    target: int = DEFAULT_GROUP_SIZE,
+) -> List[int]:
+    """
+    Sizes of the groups to split `n` users into, each between `min_size` and `max_size`.
+
+    Whenever some number of groups can seat all `n` users, the group count closest
+    to `n / target` is used and sizes differ by at most one, so nobody is left over.
+    Otherwise (e.g. 8 users with sizes 5 to 7) as many users as possible are seated
+    in `max_size` groups and the rest stay ungrouped. With min_size == max_size this
+    is the old fixed-size behaviour: n // size groups, remainder left over.
+    """
+    if min_size < 2 or max_size < min_size:
+        raise ValueError(f"Invalid group size range {min_size}-{max_size}")
+
+    fewest = -(-n // max_size)  # ceil
+    most = n // min_size
+    if fewest > most:
+        return [max_size] * most
+
+    target = min(max(target, min_size), max_size)
+    count = min(max(round(n / target), fewest), most)
+    if count == 0:
+        return []
+    base, extra = divmod(n, count)
+    return [base + 1] * extra + [base] * (count - extra)
+
+
+def resolve_group_sizes(
+    n: int,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+) -> List[int]:
+    """Solver-side helper: unset bounds fall back to the fixed `group_size`."""
+    max_size = max_size or max(group_size, min_size or group_size)
+    min_size = min_size or min(group_size, max_size)
+    return plan_group_sizes(n, min_size, max_size, target=group_size)
+
+
+async def resolve_group_size_range(city: str, min_size: Optional[int] = None, max_size: Optional[int] = None):
+    """
+    Group size bounds for a dinner. Unless given explicitly, the maximum is the smallest
+    max_group_size among the city's active restaurants, so every group fits any of them,
+    and the minimum comes from settings (capped at the maximum).
+    """
+    if max_size is None:
+        restaurant = await Restaurant.find(
+            Restaurant.city == city, Restaurant.is_active == True
+        ).sort(+Restaurant.max_group_size).first_or_none()
+        max_size = restaurant.max_group_size if restaurant else settings.MATCHMAKING_MAX_GROUP_SIZE
+    if min_size is None:
+        min_size = min(settings.MATCHMAKING_MIN_GROUP_SIZE, max_size)
+    if min_size < 2 or max_size < min_size:
+        raise HTTPException(status_code=400, detail=f"Invalid group size range {min_size}-{max_size}")
+    return min_size, max_size
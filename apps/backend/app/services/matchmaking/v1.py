@@ -1,9 +1,20 @@
 from collections import defaultdict
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from itertools import combinations
 import random
 from app.models.user import User  # or from wherever your User model lives
 from app.schemas.user import PersonalityAnswer
+from app.services.matchmaking.compatibility import (
+    PairPenalties,
+    apply_pair_penalties,
+    compatibility_matrix,
+    group_score,
+)
+from app.services.matchmaking.constraints import GroupFeatures
+from app.services.matchmaking.sizing import resolve_group_sizes
+
+ENGINE_VERSION = "1.2"
+
 # Map each question index (0-14) to a personality trait
 QUESTION_TRAIT_MAP = {
     0: "O", 1: "C", 2: "E", 3: "A", 4: "N",
@@ -52,39 +63,61 @@ def calculate_group_score(users: List[User]) -> float:
     return sum(scores) / len(scores)
 
 
-def match_users_into_groups(users: List[User], group_size: int = 6, iterations: int = 100) -> List[List[User]]:
-    """Return the best-matched user groups based on personality traits."""
-    if len(users) < group_size:
+def match_indices_into_groups(
+    matrix,
+    group_size: int = 6,
+    iterations: int = 100,
+    rng=random,
+    group_sizes: Optional[List[int]] = None,
+    features: Optional[GroupFeatures] = None,
+) -> List[List[int]]:
+    """
+    Random-sample grouping over row indices of a precomputed compatibility matrix.
+    `group_sizes` lists the size of every group to form; by default n // group_size groups of group_size.
+    Samples are scored net of the constraint penalty from `features`, if given.
+    """
+    n = matrix.shape[0]
+    if group_sizes is None:
+        group_sizes = [group_size] * (n // group_size)
+    if not group_sizes:
         return []
 
     best_groups = []
-    remaining_users = users.copy()
-    random.shuffle(remaining_users)
+    remaining = list(range(n))
+    rng.shuffle(remaining)
 
-    while len(remaining_users) >= group_size:
-        top_score = -1
+    for size in group_sizes:
+        top_score = float("-inf")  # constraint penalties can push scores below 0
         best_group = []
 
         for _ in range(iterations):
-            group = random.sample(remaining_users, group_size)
-            score = calculate_group_score(group)
+            group = rng.sample(remaining, size)
+            score = group_score(matrix, group)
+            if features is not None:
+                score -= features.penalty(group)
             if score > top_score:
                 top_score = score
                 best_group = group
 
         best_groups.append(best_group)
 
-        for u in best_group:
-            remaining_users.remove(u)
+        chosen = set(best_group)
+        remaining = [i for i in remaining if i not in chosen]
 
     return best_groups
 
 
-# Utility to run full matchmaking for a given dinner
-async def run_matchmaking_for_dinner(users: List[User]) -> List[List[User]]:
-    # Ensure each user has valid scores
-    for user in users:
-        if not user.personality_scores and user.personality_answers:
-            user.personality_scores = compute_personality_scores(user.personality_answers)
-
-    return match_users_into_groups(users)
+def match_traits_into_groups(
+    traits,
+    group_size: int = 6,
+    seed: Optional[int] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    pair_penalties: Optional[PairPenalties] = None,
+    group_features: Optional[GroupFeatures] = None,
+) -> List[List[int]]:
+    """Index-level v1 entry point: groups over the rows of an (n, 5) trait array."""
+    rng = random.Random(seed) if seed is not None else random
+    sizes = resolve_group_sizes(traits.shape[0], group_size, min_size, max_size)
+    matrix = apply_pair_penalties(compatibility_matrix(traits), pair_penalties)
+    return match_indices_into_groups(matrix, rng=rng, group_sizes=sizes, features=group_features)
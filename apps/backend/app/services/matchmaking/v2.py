@@ -0,0 +1,179 @@
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.matchmaking.compatibility import PairPenalties, penalise_block
+from app.services.matchmaking.constraints import GroupFeatures
+from app.services.matchmaking.sizing import resolve_group_sizes
+
+ENGINE_VERSION = "2.1"
+DEFAULT_TIME_BUDGET = 5.0  # seconds per bucket
+ITERATIONS_PER_GROUP = 200
+PATIENCE_PER_GROUP = 30  # stop after this many fruitless rounds per group
+
+
+def _similarity_block(traits: np.ndarray, members: List[int]) -> np.ndarray:
+    """personality_compatibility for every pair within `members` (up to float rounding)."""
+    rows = traits[members]
+    return 1 - np.abs(rows[:, None, :] - rows[None, :, :]).mean(axis=2)
+
+
+def _best_swap(
+    traits: np.ndarray,
+    group: List[int],
+    other: List[int],
+    other_is_group: bool,
+    penalties: Optional[PairPenalties] = None,
+    features: Optional[GroupFeatures] = None,
+):
+    """
+    Best single exchange between `group` and `other`.
+
+    Returns (gain, i, j) where swapping group[i] with other[j] changes the total of
+    group average scores by `gain`. Each candidate costs O(group size): only the
+    links of the two swapped users to the rest of their groups are recomputed.
+    Pairs in `penalties` count as that much less compatible, and constraint penalties
+    from `features` are subtracted.
+    """
+    size = len(group)
+    block = penalise_block(_similarity_block(traits, group + other), group + other, penalties)
+    a = np.arange(size)
+    b = np.arange(size, size + len(other))
+
+    to_group = block[:, :size].sum(axis=1)
+    cross = block[np.ix_(a, b)]
+    # b joins the group in place of a: b's links to the group minus its link to a,
+    # against a's links to the group minus the self-similarity on the diagonal.
+    gain = (to_group[b][None, :] - cross - (to_group[a] - 1)[:, None]) / (size * (size - 1) / 2)
+
+    if other_is_group:
+        other_size = len(other)
+        to_other = block[:, size:].sum(axis=1)
+        gain += (to_other[a][:, None] - cross - (to_other[b] - 1)[None, :]) / (other_size * (other_size - 1) / 2)
+
+    if features is not None:
+        gain -= features.swap_cost(group, other, other_is_group)
+
+    i, j = np.unravel_index(np.argmax(gain), gain.shape)
+    return float(gain[i, j]), int(i), int(j)
+
+
+def _warm_partition(order: List[int], sizes: List[int], initial_groups: List[List[int]]):
+    """
+    Fit a previous partition onto the planned `sizes`: the largest previous groups take
+    the largest slots, members beyond a slot spill into the pool, and short groups are
+    topped up from the pool (users the previous partition did not place come first, in
+    `order`). Returns (groups, leftovers).
+    """
+    placed = set()
+    previous = []
+    for group in initial_groups:
+        members = [i for i in group if 0 <= i < len(order) and i not in placed]
+        placed.update(members)
+        previous.append(members)
+    previous.sort(key=len, reverse=True)
+
+    pool = [i for i in order if i not in placed]
+    groups = []
+    for slot, size in enumerate(sorted(sizes, reverse=True)):
+        members = previous[slot] if slot < len(previous) else []
+        pool.extend(members[size:])
+        groups.append(members[:size])
+    for members in previous[len(sizes):]:
+        pool.extend(members)
+
+    for members, size in zip(groups, sorted(sizes, reverse=True)):
+        missing = size - len(members)
+        members.extend(pool[:missing])
+        del pool[:missing]
+    return groups, pool
+
+
+def match_traits_into_groups(
+    traits: np.ndarray,
+    group_size: int = 6,
+    seed: Optional[int] = None,
+    max_iterations: Optional[int] = None,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    initial_groups: Optional[List[List[int]]] = None,
+    pair_penalties: Optional[PairPenalties] = None,
+    group_features: Optional[GroupFeatures] = None,
+) -> List[List[int]]:
+    """
+    Partition the rows of `traits` into groups and improve them by local search.
+
+    Group sizes come from plan_group_sizes: fixed at `group_size` by default, or mixed
+    within `min_size`..`max_size` so the whole bucket is seated. Starts from a seeded
+    random partition into those sizes (users that do not fit are kept as a leftover
+    pool) and repeatedly applies the best exchange between two randomly picked groups,
+    or a group and the leftover pool, while it improves the summed group score. Swaps
+    keep every group's size. Stops after `max_iterations` rounds, `time_budget`
+    seconds, or once no round has improved anything for a while.
+
+    `initial_groups` warm-starts the search from an earlier partition of (mostly) the
+    same rows instead of a random one, e.g. a provisional partition kept up to date
+    while users opt in. `pair_penalties` lowers the compatibility of given pairs, e.g.
+    people who dined together recently. `group_features` adds gender/age constraints,
+    each group's score dropping by its constraint penalty. That makes every swap
+    evaluation dearer (about 1.6x with a gender limit, 1.9x with an age limit and 2.4x
+    with both, for groups of 6; see benchmark_matchmaking's swap timings), so a time
+    budget fits fewer rounds. Features without any limit set are ignored, leaving the
+    unconstrained search as fast as without them.
+    """
+    if group_features is not None and not group_features.constraints.active:
+        group_features = None
+
+    n = traits.shape[0]
+    sizes = resolve_group_sizes(n, group_size, min_size, max_size)
+    if not sizes:
+        return []
+
+    rng = random.Random(seed)
+    order = list(range(n))
+    rng.shuffle(order)
+
+    group_count = len(sizes)
+    if initial_groups:
+        groups, leftovers = _warm_partition(order, sizes, initial_groups)
+    else:
+        groups = []
+        start = 0
+        for size in sizes:
+            groups.append(order[start:start + size])
+            start += size
+        leftovers = order[start:]
+
+    if max_iterations is None:
+        max_iterations = ITERATIONS_PER_GROUP * group_count
+    patience = PATIENCE_PER_GROUP * group_count
+    deadline = time.perf_counter() + time_budget
+    partners = group_count + (1 if leftovers else 0)
+    if partners < 2:
+        return groups
+
+    stale = 0
+    for iteration in range(max_iterations):
+        if stale >= patience or (iteration % 64 == 0 and time.perf_counter() > deadline):
+            break
+
+        g = rng.randrange(group_count)
+        h = rng.randrange(partners - 1)
+        if h >= g:
+            h += 1
+
+        group = groups[g]
+        other_is_group = h < group_count
+        other = groups[h] if other_is_group else leftovers
+
+        gain, i, j = _best_swap(traits, group, other, other_is_group, pair_penalties, group_features)
+        if gain > 1e-12:
+            group[i], other[j] = other[j], group[i]
+            stale = 0
+        else:
+            stale += 1
+
+    return groups
@@ -1,10 +1,63 @@
 # app/services/session.py
 
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.revocations import revocation_list
+from app.models.revoked_token import RevokedToken
 from app.models.session import Session
+from beanie.operators import Set
 from uuid import uuid4
 from datetime import datetime, timedelta, timezone
-from app.utils.jwt import create_tokens
-from fastapi import Request
+from app.utils.jwt import create_tokens, read_token_claims
+from fastapi import HTTPException, Request
+import time
+
+
+async def revoke_access_token(access_token: str):
+    """
+    Reject `access_token` from now on, also where it is checked statelessly: its jti is
+    recorded until the token would have expired, and other workers pick it up on their
+    next revocation list refresh.
+    """
+    auth_cache.invalidate_token(access_token)
+    claims = read_token_claims(access_token)
+    if not claims or not claims.get("jti") or claims.get("exp", 0) <= time.time():
+        return  # issued before access tokens had a jti, or already expired
+    jti = claims["jti"]
+    await RevokedToken.get_motor_collection().update_one(
+        {"jti": jti},
+        {"$setOnInsert": {
+            "jti": jti,
+            "expires_at": datetime.fromtimestamp(claims["exp"], timezone.utc),
+            "revoked_at": datetime.now(timezone.utc),
+        }},
+        upsert=True,
+    )
+    revocation_list.add(jti, claims["exp"])
+
+
+async def ensure_access_token_active(token: str, payload: dict):
+    """
+    Raise 401 unless the access token's session is still active. With
+    AUTH_STATELESS_TOKENS the in-memory revocation list answers instead of the session;
+    the database is only asked when the list can't tell (a Bloom filter hit or a stale
+    list), and tokens without a jti still go through their session.
+    """
+    jti = payload.get("jti")
+    if settings.AUTH_STATELESS_TOKENS and jti:
+        revoked = revocation_list.is_revoked(jti)
+        if revoked is None:
+            revoked = await RevokedToken.get_motor_collection().find_one({"jti": jti}, {"_id": 1}) is not None
+            if revoked:
+                revocation_list.add(jti, payload["exp"])
+        if revoked:
+            raise HTTPException(status_code=401, detail="Session not active or token expired")
+        return
+
+    session = await Session.find_one(Session.access_token == token)
+    if not session or not session.is_active:
+        raise HTTPException(status_code=401, detail="Session not active or token expired")
+
 
 async def create_or_update_session(
     email: str, 
@@ -18,12 +71,27 @@ async def create_or_update_session(
     ip_address = request.client.host if request and request.client else None
 
     if existing_session:
-        existing_session.access_token = access_token
-        existing_session.refresh_token = refresh_token
-        existing_session.expires_at = now + timedelta(days=7)
-        existing_session.user_agent = user_agent
-        existing_session.ip_address = ip_address
-        await existing_session.save()
+        # Only an active session is extended: a logged-out one must stay out, also when its
+        # refresh token is used before the TTL monitor removes it
+        changes = {
+            Session.access_token: access_token,
+            Session.refresh_token: refresh_token,
+            Session.expires_at: now + timedelta(days=7),
+            Session.user_agent: user_agent,
+            Session.ip_address: ip_address,
+        }
+        result = await Session.find_one(
+            Session.id == existing_session.id,
+            Session.refresh_token == existing_session.refresh_token,
+            Session.is_active == True,
+        ).update(Set(changes))
+        if result.modified_count != 1:
+            raise HTTPException(status_code=401, detail="Session not found or expired")
+
+        # The old access token stops working with the refresh
+        await revoke_access_token(existing_session.access_token)
+        for field, value in changes.items():
+            setattr(existing_session, str(field), value)
         return existing_session
     else:
         session = Session(
@@ -0,0 +1,157 @@
+# app/services/smtp_pool.py
+import queue
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Errors after which a connection can't be trusted any more; the message is retried once on a fresh one.
+# Not OSError: every SMTPException is one, and a refused recipient or rejected DATA leaves the
+# connection usable (smtplib has already sent RSET), so server replies are raised as they are.
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout, ssl.SSLError,
+)
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """
+    Authenticated SMTP connections shared by every sender of a process, so STARTTLS and
+    LOGIN happen once per connection instead of once per email. At most `size`
+    connections are open at a time; idle ones get a NOOP before reuse, are replaced
+    after `max_messages` emails (servers cap messages per session), and a connection
+    that fails mid-send is dropped and the email retried once on a fresh one.
+    Thread-safe, so threads sending in parallel each get their own connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        size: int = 4,
+        max_messages: int = 100,
+        idle_check_seconds: float = 30,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_messages = max_messages
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connects = 0  # connections opened so far, for stats and benchmarks
+
+    def _connect(self) -> _PooledConnection:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        self.connects += 1
+        return _PooledConnection(server)
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _healthy(self, connection: _PooledConnection) -> bool:
+        if connection.sent >= self.max_messages:
+            return False
+        if time.monotonic() - connection.last_used < self.idle_check_seconds:
+            return True
+        try:
+            return connection.server.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    def _take(self) -> _PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if self._healthy(connection):
+                return connection
+            self._close(connection.server)
+
+    @contextmanager
+    def connection(self) -> Iterator[_PooledConnection]:
+        """
+        A healthy, logged-in connection, back to the pool afterwards unless it broke. Server
+        replies like a refused recipient propagate but keep the connection.
+        """
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._take()
+            yield connection
+        except CONNECTION_ERRORS:
+            if connection is not None:
+                self._close(connection.server)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                connection.last_used = time.monotonic()
+                self._idle.put(connection)
+            self._slots.release()
+
+    def send_message(self, message: Message):
+        for attempt in (1, 2):
+            try:
+                with self.connection() as connection:
+                    connection.server.send_message(message)
+                    connection.sent += 1
+                return
+            except CONNECTION_ERRORS as e:
+                if attempt == 2:
+                    raise
+                logger.warning(f"⚠️ SMTP connection failed ({e}), retrying on a new one")
+
+    def close(self):
+        """Log out of every idle connection; in-use ones close when they come back."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection.server)
+
+
+smtp_pool = SMTPPool(
+    settings.SMTP_SERVER,
+    int(settings.SMTP_PORT),
+    username=settings.EMAIL_SENDER,
+    password=settings.EMAIL_PASSWORD,
+    starttls=settings.SMTP_STARTTLS,
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    idle_check_seconds=settings.SMTP_IDLE_CHECK_SECONDS,
+)
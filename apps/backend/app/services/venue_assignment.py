@@ -0,0 +1,207 @@
+# app/services/venue_assignment.py
+import asyncio
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from beanie import PydanticObjectId
+from beanie.operators import In
+from fastapi import HTTPException
+from pydantic import BaseModel, EmailStr, Field
+from pymongo import UpdateOne
+
+from app.core.logger import logger
+from app.core.notifications.producer import queue_notifications
+from app.models.dinner import Dinner, DinnerGroup
+from app.models.user import User
+from app.models.venue import Venue
+
+BUDGET_TIERS = ["low", "medium", "high"]  # budget_category values, cheapest first
+LOAD_COST = 0.01  # per group a venue already hosts, so groups spread over venues when tiers tie
+UNASSIGNED_COST = 1000.0  # leaving a group without a venue; above any budget mismatch
+INFEASIBLE_COST = 1e9  # the group does not fit the venue's tables
+
+
+class _AssignedVenue(BaseModel):
+    venue_id: Optional[PydanticObjectId] = None
+
+
+class _Recipient(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    email: EmailStr
+    name: Optional[str] = ""
+
+
+def _tier_distance(budget_category: Optional[str], tiers: Sequence[str]) -> float:
+    """How far a group's budget is from the nearest tier a venue serves (0 if it serves all)."""
+    if not tiers or budget_category in tiers:
+        return 0.0
+    if budget_category not in BUDGET_TIERS:
+        return 1.0
+    rank = BUDGET_TIERS.index(budget_category)
+    return float(min(
+        (abs(rank - BUDGET_TIERS.index(tier)) for tier in tiers if tier in BUDGET_TIERS), default=1
+    ))
+
+
+def solve_assignment(cost: np.ndarray) -> List[int]:
+    """
+    Minimum-cost assignment of every row to a distinct column (rows <= columns),
+    Hungarian method with potentials; each augmentation scans the columns as arrays.
+    Returns the column of each row.
+    """
+    rows, columns = cost.shape
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    owner = np.zeros(columns + 1, dtype=np.int64)  # row (1-based) holding each column, 0 = free
+    way = np.zeros(columns + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        min_reduced = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = owner[column]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = column
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[~used] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+
+    assignment = [0] * rows
+    for column in range(1, columns + 1):
+        if owner[column]:
+            assignment[owner[column] - 1] = column - 1
+    return assignment
+
+
+def plan_venue_assignment(
+    groups: List[DinnerGroup], venues: List[Venue], taken: Optional[Dict[PydanticObjectId, int]] = None
+) -> Dict[PydanticObjectId, Optional[PydanticObjectId]]:
+    """
+    Pick a venue for every group in one pass: each venue offers its remaining capacity as
+    tables, a group only fits tables of venues whose max_group_size seats it, budget
+    mismatches cost their tier distance and later tables of a venue cost a little more.
+    `taken` counts tables already used per venue. Returns group id -> venue id (None if
+    no venue could take the group).
+    """
+    taken = taken or {}
+    tables = []
+    for venue in venues:
+        for k in range(taken.get(venue.id, 0), venue.capacity):
+            tables.append((venue, k))
+    if not groups:
+        return {}
+
+    # One "no venue" column per group keeps the problem feasible when tables run out
+    cost = np.full((len(groups), len(tables) + len(groups)), UNASSIGNED_COST)
+    for column, (venue, k) in enumerate(tables):
+        for row, group in enumerate(groups):
+            if venue.max_group_size is not None and len(group.participant_ids) > venue.max_group_size:
+                cost[row, column] = INFEASIBLE_COST
+            else:
+                cost[row, column] = _tier_distance(group.budget_category, venue.budget_tiers) + LOAD_COST * k
+
+    plan = {}
+    for row, column in enumerate(solve_assignment(cost)):
+        fits = column < len(tables) and cost[row, column] < INFEASIBLE_COST
+        plan[groups[row].id] = tables[column][0].id if fits else None
+    return plan
+
+
+async def notify_venue_assignment(dinner: Dinner, groups: List[DinnerGroup], venues: Dict[PydanticObjectId, Venue]) -> int:
+    """Queue a VENUE_UPDATE email for every participant of `groups`; one $in query for all of them."""
+    user_ids = [user_id for group in groups for user_id in group.participant_ids]
+    users = {
+        user.id: user
+        for user in await User.find(In(User.id, user_ids)).project(_Recipient).to_list()
+    }
+    messages = []
+    for group in groups:
+        venue = venues[group.venue_id]
+        for user_id in group.participant_ids:
+            user = users.get(user_id)
+            if not user:
+                continue
+            messages.append({
+                "type": "VENUE_UPDATE",
+                "to_email": user.email,
+                "name": user.name or "there",
+                "venue_name": venue.name,
+                "venue_address": venue.address,
+                "city": venue.city,
+                "date": dinner.date.strftime("%A, %d %B %Y"),
+            })
+    if messages:
+        failed = await asyncio.to_thread(queue_notifications, messages)
+        if failed:
+            logger.warning("⚠️ %d of %d venue notifications were not queued", failed, len(messages))
+    return len(messages)
+
+
+async def assign_venues(dinner_id: PydanticObjectId, notify: bool = True) -> dict:
+    """
+    Assign venues to every matched group of a dinner that has none yet, using the active
+    venues in the dinner's city. Persists all assignments in one bulk write (skipping
+    groups that got a venue in the meantime) and notifies the participants.
+    """
+    dinner = await Dinner.get(dinner_id)
+    if not dinner:
+        raise HTTPException(status_code=404, detail="Dinner not found")
+
+    groups = await DinnerGroup.find(DinnerGroup.dinner_id == dinner.id, DinnerGroup.venue_id == None).to_list()
+    venues = await Venue.find(Venue.city == dinner.city, Venue.is_active == True).to_list()
+    assigned = await DinnerGroup.find(
+        DinnerGroup.dinner_id == dinner.id, DinnerGroup.venue_id != None
+    ).project(_AssignedVenue).to_list()
+    taken = Counter(group.venue_id for group in assigned)
+
+    plan = plan_venue_assignment(groups, venues, taken)
+    operations = [
+        UpdateOne({"_id": group_id, "venue_id": None}, {"$set": {"venue_id": venue_id}})
+        for group_id, venue_id in plan.items()
+        if venue_id is not None
+    ]
+    updated = 0
+    if operations:
+        result = await DinnerGroup.get_motor_collection().bulk_write(operations, ordered=False)
+        updated = result.modified_count
+
+    placed = [group for group in groups if plan.get(group.id)]
+    for group in placed:
+        group.venue_id = plan[group.id]
+    if updated < len(placed):
+        # Someone set a venue by hand while we were solving: don't notify for those groups
+        fresh = {
+            group.id for group in await DinnerGroup.find(
+                In(DinnerGroup.id, [group.id for group in placed])
+            ).to_list()
+            if group.venue_id == plan[group.id]
+        }
+        placed = [group for group in placed if group.id in fresh]
+
+    notified = await notify_venue_assignment(dinner, placed, {venue.id: venue for venue in venues}) if notify else 0
+    unassigned = [str(group_id) for group_id, venue_id in plan.items() if venue_id is None]
+    logger.info("🍽️ Assigned venues to %d groups of dinner %s (%d left without a venue)",
+                len(placed), dinner.id, len(unassigned))
+    return {
+        "dinner_id": str(dinner.id),
+        "assigned": len(placed),
+        "unassigned_group_ids": unassigned,
+        "notified_users": notified,
+    }
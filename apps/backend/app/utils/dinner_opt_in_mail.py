@@ -1,7 +1,7 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
+from app.services.smtp_pool import smtp_pool
 from app.core.logger import logger
 
 
@@ -33,11 +33,8 @@ def send_dinner_opt_in_email(to_email: str, name: str, date: str, time: str, cit
         """
         message.attach(MIMEText(body, "plain"))
 
-        # Connect to SMTP server
-        with smtplib.SMTP(settings.SMTP_SERVER, int(settings.SMTP_PORT)) as server:
-            server.starttls()
-            server.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
-            server.send_message(message)
+        # Send over a pooled, already logged-in connection
+        smtp_pool.send_message(message)
 
         logger.info(f"✅ Dinner opt-in email sent to {to_email}")
 
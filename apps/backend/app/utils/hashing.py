@@ -1,6 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # The bcrypt package releases the GIL (libc crypt, passlib's fallback, does not), so a few
+        # threads hash in parallel; logins beyond that queue up
+        _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password off the event loop: a bcrypt check takes 100-300 ms of CPU."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), verify_password, plain_password, hashed_password)
@@ -3,6 +3,7 @@ import string
 from datetime import datetime, timedelta, timezone
 from app.models.otp import OTP
 from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
 
 COOLDOWN_SECONDS = 60  # You can change this to 90/120/etc.
 
@@ -14,51 +15,30 @@ def generate_otp(length: int = 6) -> str:
     return ''.join(random.choices(string.digits, k=length))
 
 async def save_otp(email: str, otp: str):
-    existing_otp = await OTP.find_one({"email": email})
-    now = datetime.now(timezone.utc)  # Ensure this is timezone-aware
-
-    if existing_otp:
-        # Ensure existing datetime is timezone-aware
-        created = existing_otp.created_at
+    """
+    Issue `otp` for `email` in one atomic upsert. The cooldown is part of the filter: a
+    recent OTP doesn't match, so the upsert tries to insert a second one for the email
+    and the unique index rejects it, however many requests race.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        await OTP.get_motor_collection().find_one_and_update(
+            {"email": email, "created_at": {"$lte": now - timedelta(seconds=COOLDOWN_SECONDS)}},
+            {"$set": {"otp": otp, "created_at": now, "expires_at": now + timedelta(minutes=5)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        existing_otp = await OTP.find_one(OTP.email == email)
+        created = existing_otp.created_at if existing_otp else now
         if created.tzinfo is None:
             created = created.replace(tzinfo=timezone.utc)
-
-        # Apply cooldown check
-        if (now - created).total_seconds() < COOLDOWN_SECONDS:
-            remaining = COOLDOWN_SECONDS - int((now - created).total_seconds())
-            raise HTTPException(status_code=429, detail=f"Wait {remaining} seconds before requesting another OTP.")
-
-    # Set expiry
-    expires = now + timedelta(minutes=5)
-
-    if existing_otp:
-        existing_otp.otp = otp
-        existing_otp.created_at = now
-        existing_otp.expires_at = expires
-        await existing_otp.save()
-    else:
-        otp_entry = OTP(email=email, otp=otp, created_at=now, expires_at=expires)
-        await otp_entry.insert()
+        remaining = max(COOLDOWN_SECONDS - int((now - created).total_seconds()), 1)
+        raise HTTPException(status_code=429, detail=f"Wait {remaining} seconds before requesting another OTP.")
 
 
 async def verify_otp(email: str, otp: str) -> bool:
-    otp_doc = await OTP.find_one(OTP.email == email)
-    if not otp_doc:
-        return False
-
-    now = datetime.now(timezone.utc)
-
-    # Ensure timezone-aware comparison
-    expires_at = otp_doc.expires_at
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-    if now > expires_at:
-        await otp_doc.delete()
-        return False
-
-    if otp_doc.otp != otp:
-        return False
-
-    await otp_doc.delete()
-    return True
+    """Consume a matching, unexpired OTP in one atomic delete, so each code works only once."""
+    otp_doc = await OTP.get_motor_collection().find_one_and_delete(
+        {"email": email, "otp": otp, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+    )
+    return otp_doc is not None
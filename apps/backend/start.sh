@@ -3,6 +3,12 @@
 echo "🚀 Starting FastAPI server..."
 uvicorn app.main:app --host 0.0.0.0 --port 8000 &
 
+echo "🗓️ Starting matchmaker cron worker..."
+python -m app.crons.matchmaker &
+
+echo "⭐ Starting feedback aggregator cron worker..."
+python -m app.crons.feedback_aggregator &
+
 echo "📨 Starting mail cron worker..."
 python -m app.crons.notification_consumer
 
@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+
+import pytest
+
+# Unit tests need no real services: fill in the required settings unless a .env provides them
+if not Path(".env").exists():
+    for name, value in {
+        "MONGO_URI": "mongodb://localhost:27017",
+        "DATABASE_NAME": "bichance_test",
+        "SECRET_KEY": "test-secret",
+        "EMAIL_SENDER": "test@example.com",
+        "EMAIL_PASSWORD": "test",
+        "SMTP_SERVER": "localhost",
+        "SMTP_PORT": "25",
+        "STRIPE_SECRET_KEY": "sk_test",
+        "SQS_QUEUE_URL": "http://localhost/queue",
+        "AWS_ACCESS_KEY_ID": "test",
+        "AWS_SECRET_ACCESS_KEY": "test",
+        "AWS_REGION": "us-east-1",
+        "STRIPE_WEBHOOK_SECRET": "whsec_test",
+        "STRIPE_PRICE_ID": "price_test",
+        "FRONTEND_URL": "http://localhost",
+    }.items():
+        os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def mongo(monkeypatch):
+    """Beanie on an in-memory mongomock database, for tests of request and service code."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from beanie import init_beanie
+
+    from app.models.revoked_token import RevokedToken
+    from app.models.session import Session
+    from app.models.subscription import Subscription
+    from app.models.user import User
+
+    models = [User, Session, RevokedToken, Subscription]
+    # mongomock deletes TTL-expired documents on every read, where Mongo's TTL monitor takes up
+    # to a minute; without those indexes tests see what Mongo would until the monitor's next pass
+    for model in models:
+        indexes = getattr(model.Settings, "indexes", [])
+        monkeypatch.setattr(model.Settings, "indexes", [
+            index for index in indexes if "expireAfterSeconds" not in index.document
+        ])
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    await init_beanie(database=client["bichance_test"], document_models=models)
+    return client
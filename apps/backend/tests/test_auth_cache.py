@@ -0,0 +1,97 @@
+from typing import Dict
+
+import pytest
+from pydantic import BaseModel, Field
+
+from app.core import auth_cache as auth_cache_module
+from app.core.auth_cache import AuthCache
+
+
+class Principal(BaseModel):
+    """Stands in for User, which can't be built before Beanie is initialised."""
+    email: str
+    name: str = ""
+    personality_scores: Dict[str, float] = Field(default_factory=dict)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth_cache_module, "time", clock)
+    return clock
+
+
+def user(email: str = "diner@example.com") -> Principal:
+    return Principal(email=email, name="Diner")
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = AuthCache(ttl=60, max_entries=10)
+    cache.put("user", "token", "diner@example.com", user())
+
+    clock.now += 59
+    assert cache.get("user", "token").name == "Diner"
+    clock.now += 2
+    assert cache.get("user", "token") is None
+
+
+def test_entries_expire_with_their_token(clock):
+    cache = AuthCache(ttl=60, max_entries=10)
+    cache.put("user", "token", "diner@example.com", user(), token_expires_at=clock.now + 10)
+
+    clock.now += 11
+    assert cache.get("user", "token") is None
+
+    cache.put("user", "expired", "diner@example.com", user(), token_expires_at=clock.now - 1)
+    assert cache.get("user", "expired") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = AuthCache(ttl=60, max_entries=2)
+    cache.put("user", "a", "a@example.com", user("a@example.com"))
+    cache.put("user", "b", "b@example.com", user("b@example.com"))
+    assert cache.get("user", "a") is not None
+
+    cache.put("user", "c", "c@example.com", user("c@example.com"))
+    assert cache.get("user", "b") is None
+    assert cache.get("user", "a") is not None
+    assert cache.get("user", "c") is not None
+    assert cache._by_email.keys() == {"a@example.com", "c@example.com"}
+
+
+def test_invalidate_by_email_and_by_jti(clock):
+    cache = AuthCache(ttl=60, max_entries=10)
+    cache.put("user", "phone", "diner@example.com", user(), jti="jti-phone")
+    cache.put("user", "laptop", "diner@example.com", user(), jti="jti-laptop")
+    cache.put("user", "other", "other@example.com", user("other@example.com"), jti="jti-other")
+
+    cache.invalidate_jti("jti-phone")
+    assert cache.get("user", "phone") is None
+    assert cache.get("user", "laptop") is not None
+
+    cache.invalidate_email("diner@example.com")
+    assert cache.get("user", "laptop") is None
+    assert cache.get("user", "other") is not None
+    assert cache._by_jti.keys() == {"jti-other"}
+
+
+def test_lookups_return_copies(clock):
+    cache = AuthCache(ttl=60, max_entries=10)
+    cache.put("user", "token", "diner@example.com", user())
+
+    cached = cache.get("user", "token")
+    cached.name = "Changed"
+    cached.personality_scores["O"] = 1.0
+    assert cache.get("user", "token").name == "Diner"
+    assert cache.get("user", "token").personality_scores == {}
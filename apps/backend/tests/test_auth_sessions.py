@@ -0,0 +1,67 @@
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.revocations import revocation_list
+from app.main import app
+from app.models.session import Session
+from app.models.user import User
+from app.services.session import create_or_update_session
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "diner@example.com"
+
+
+@pytest.fixture(params=[False, True], ids=["session-checks", "stateless"])
+async def client(request, mongo, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS_TOKENS", request.param)
+    auth_cache.clear()
+    revocation_list.recent.clear()
+    revocation_list._rebuilt_at = None
+    await revocation_list.refresh()
+    await User(email=EMAIL).insert()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_refresh_replaces_the_access_token(client):
+    session = await create_or_update_session(EMAIL)
+    assert (await client.get("/api/v1/users/me", headers=bearer(session.access_token))).status_code == 200
+
+    response = await client.post("/api/v1/auth/refresh-token", headers=bearer(session.refresh_token))
+    assert response.status_code == 200
+    tokens = response.json()["data"]
+
+    assert (await client.get("/api/v1/users/me", headers=bearer(tokens["access_token"]))).status_code == 200
+    assert (await client.get("/api/v1/users/me", headers=bearer(session.access_token))).status_code == 401
+
+
+async def test_refresh_after_logout_is_rejected(client):
+    session = await create_or_update_session(EMAIL)
+    assert (await client.get("/api/v1/users/me", headers=bearer(session.access_token))).status_code == 200
+
+    assert (await client.post("/api/v1/auth/logout", headers=bearer(session.refresh_token))).status_code == 200
+    # Until the TTL monitor's next pass, the logged-out session is still in the collection
+    assert await Session.get(session.id) is not None
+
+    response = await client.post("/api/v1/auth/refresh-token", headers=bearer(session.refresh_token))
+    assert response.status_code == 401
+    assert (await client.get("/api/v1/users/me", headers=bearer(session.access_token))).status_code == 401
+
+
+async def test_logged_out_session_is_not_extended(client):
+    session = await create_or_update_session(EMAIL)
+    stale = await Session.get(session.id)  # read by a refresh racing the logout
+    assert (await client.post("/api/v1/auth/logout", headers=bearer(session.refresh_token))).status_code == 200
+
+    with pytest.raises(HTTPException) as raised:
+        await create_or_update_session(EMAIL, existing_session=stale)
+    assert raised.value.status_code == 401
+    assert (await Session.get(session.id)).is_active is False
@@ -0,0 +1,64 @@
+import time
+from collections import Counter
+from itertools import combinations
+from typing import List
+
+import numpy as np
+import pytest
+
+from app.services.matchmaking.compatibility import compatibility_matrix, group_score
+from app.services.matchmaking.exact import solve_exact
+
+
+def brute_force(matrix: np.ndarray, sizes: List[int]) -> float:
+    """Best summed group average over every partition, by plain enumeration."""
+    best = -np.inf
+
+    def search(remaining: List[int], open_sizes: Counter, skips: int, total: float):
+        nonlocal best
+        if not open_sizes:
+            best = max(best, total)
+            return
+        first, rest = remaining[0], remaining[1:]
+        for size in list(open_sizes):
+            for others in combinations(rest, size - 1):
+                members = [first, *others]
+                open_sizes[size] -= 1
+                search([r for r in rest if r not in others], +open_sizes, skips, total + group_score(matrix, members))
+                open_sizes[size] += 1
+        if skips:
+            search(rest, open_sizes, skips - 1, total)
+
+    search(list(range(matrix.shape[0])), Counter(sizes), matrix.shape[0] - sum(sizes), 0.0)
+    return best
+
+
+def random_matrix(rng: np.random.Generator, n: int) -> np.ndarray:
+    upper = np.triu(rng.random((n, n)), 1)
+    return upper + upper.T
+
+
+@pytest.mark.parametrize("n, sizes", [
+    (11, [5, 6]),
+    (11, [3, 4, 4]),
+    (12, [4, 4, 4]),
+    (12, [5, 6]),  # one user left out
+    (13, [4, 4, 5]),
+    (13, [4, 4, 4]),
+])
+@pytest.mark.parametrize("seed", range(3))
+def test_solve_exact_matches_brute_force(n, sizes, seed):
+    rng = np.random.default_rng(seed)
+    # Trait-based matrices as in production, and unstructured ones that prune less
+    matrix = compatibility_matrix(rng.random((n, 5))) if seed % 2 else random_matrix(rng, n)
+    incumbent, start = [], 0
+    for size in sizes:
+        incumbent.append(list(range(start, start + size)))
+        start += size
+
+    groups = solve_exact(matrix, incumbent, sizes, deadline=time.perf_counter() + 60)
+
+    seated = [member for group in groups for member in group]
+    assert len(seated) == len(set(seated))
+    assert sorted(len(group) for group in groups) == sorted(sizes)
+    assert sum(group_score(matrix, group) for group in groups) == pytest.approx(brute_force(matrix, sizes), abs=1e-9)
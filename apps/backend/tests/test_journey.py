@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+from app.core.auth_cache import auth_cache
+from app.main import app
+from app.models.user import User
+from app.services.session import create_or_update_session
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "diner@example.com"
+
+
+@pytest.fixture
+async def client(mongo):
+    auth_cache.clear()
+    await User(email=EMAIL).insert()
+    session = await create_or_update_session(EMAIL)
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        yield client
+
+
+async def test_save_keeps_fields_changed_behind_the_auth_cache(client):
+    assert (await client.get("/api/v1/users/me")).status_code == 200  # caches the user
+    # A Stripe webhook handled by another worker, whose invalidation never reaches this one
+    await User.find_one(User.email == EMAIL).update({"$set": {"subscription_status": "active"}})
+
+    for key, answer in (("q3", "1"), ("name", "Ada"), ("current_city", "Berlin")):
+        response = await client.post("/api/v1/journey/save", json={"question_key": key, "answer": answer})
+        assert response.status_code == 200
+
+    user = await User.find_one(User.email == EMAIL)
+    assert user.subscription_status == "active"
+    assert user.name == "Ada" and user.current_city == "Berlin"
+    assert user.personality_answers[3].answer == "1" and user.personality_answers[3].trait == "A"
+
+
+async def test_submit_stores_scores(client):
+    for index in range(15):
+        await client.post("/api/v1/journey/save", json={"question_key": f"q{index}", "answer": "1"})
+    await User.find_one(User.email == EMAIL).update({"$set": {"subscription_status": "active"}})
+
+    response = await client.post("/api/v1/journey/submit")
+    assert response.status_code == 200
+
+    user = await User.find_one(User.email == EMAIL)
+    assert user.personality_scores == response.json()["data"]["scores"]
+    assert user.subscription_status == "active"
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.crons import matchmaker
+from app.models.dinner import DinnerSchedule
+
+pytestmark = pytest.mark.anyio
+
+
+def dinner(city: str) -> DinnerSchedule:
+    return DinnerSchedule(_id=PydanticObjectId(), date=datetime.now(timezone.utc), city=city)
+
+
+async def test_slow_city_holds_one_worker_at_most(monkeypatch):
+    slow_job_done = asyncio.Event()
+    matched = []
+
+    async def finish_slow_job():
+        await slow_job_done.wait()
+        return type("Job", (), {"id": "job", "status": "completed"})()
+
+    async def match_dinner(schedule):
+        matched.append(schedule.id)
+        # Every Berlin job runs past the timeout, Paris ones finish in time
+        return asyncio.ensure_future(finish_slow_job()) if schedule.city == "Berlin" else None
+
+    monkeypatch.setattr(matchmaker, "match_dinner", match_dinner)
+    berlin = [dinner("Berlin") for _ in range(3)]
+    paris = [dinner("Paris") for _ in range(3)]
+    workers = asyncio.Semaphore(3)
+
+    await asyncio.gather(matchmaker.run_city_lane(berlin, workers), matchmaker.run_city_lane(paris, workers))
+    assert matched == [berlin[0].id, paris[0].id, paris[1].id, paris[2].id]
+    assert workers._value == 2  # only Berlin's timed-out job holds one
+
+    # Next pass: Berlin still waits for its job, the pool is not drained further
+    await matchmaker.run_city_lane(berlin[1:], workers)
+    assert len(matched) == 4 and workers._value == 2
+
+    slow_job_done.set()
+    await asyncio.gather(*matchmaker._background_jobs.values())
+    assert workers._value == 3 and not matchmaker._background_jobs
+
+    await matchmaker.run_city_lane(berlin[1:], workers)
+    assert matched[4] == berlin[1].id
+    await asyncio.gather(*matchmaker._background_jobs.values())
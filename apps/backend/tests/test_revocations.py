@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import revocations
+from app.core.auth_cache import auth_cache
+from app.core.revocations import BloomFilter, RevocationList
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+INTERVAL = 5
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1 << 16)
+    added = [f"jti-{i}" for i in range(2000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    # About 1e-5 expected at this load; the hashes are fixed, so the count is too
+    assert sum(f"other-{i}" in bloom for i in range(10000)) <= 5
+
+
+async def revoke(jti: str, revoked_at: datetime = None):
+    now = datetime.now(timezone.utc)
+    await RevokedToken(jti=jti, expires_at=now + timedelta(minutes=30), revoked_at=revoked_at or now).insert()
+
+
+@pytest.fixture
+async def revoked(mongo):
+    revocation_list = RevocationList(1 << 16, INTERVAL)
+    for i in range(500):
+        await revoke(f"old-{i}")
+    await revocation_list.refresh()  # the first refresh rebuilds
+    return revocation_list
+
+
+@pytest.mark.anyio
+async def test_no_false_negatives_after_a_rebuild(revoked):
+    assert revoked.recent == {}
+    assert all(revoked.is_revoked(f"old-{i}") is not False for i in range(500))
+    assert revoked.is_revoked("never-revoked") is False
+
+
+@pytest.mark.anyio
+async def test_revocation_after_the_rebuild_is_found(revoked):
+    await revoke("new")
+    # Written by a worker whose clock runs a little behind the last revocation loaded
+    await revoke("skewed", revoked_at=revoked._cursor - timedelta(seconds=2))
+    assert revoked.is_revoked("new") is False
+
+    await revoked.refresh()
+    assert revoked._rebuilt_at is not None and "new" in revoked.recent
+    assert revoked.is_revoked("new") is True
+    assert revoked.is_revoked("skewed") is True
+
+
+@pytest.mark.anyio
+async def test_next_rebuild_moves_recent_revocations_into_the_filter(revoked):
+    await revoke("new")
+    await revoked.refresh()
+    revoked._rebuilt_at -= revocations.REBUILD_SECONDS
+
+    await revoked.refresh()
+    assert "new" not in revoked.recent
+    assert revoked.is_revoked("new") is not False
+
+
+@pytest.mark.anyio
+async def test_stale_list_defers_to_the_database(revoked):
+    revoked.add("local", datetime.now(timezone.utc).timestamp() + 60)
+    revoked._synced_at -= revocations.STALE_AFTER_REFRESHES * INTERVAL + 1
+
+    assert not revoked.fresh
+    assert revoked.is_revoked("never-revoked") is None
+    assert revoked.is_revoked("local") is True  # known for certain either way
+
+
+@pytest.mark.anyio
+async def test_loaded_revocation_drops_cached_principal(revoked):
+    auth_cache.clear()
+    auth_cache.put("user", "token", "diner@example.com", User(email="diner@example.com"), jti="cached")
+    await revoke("cached")
+
+    await revoked.refresh()
+    assert auth_cache.get("user", "token") is None
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.api.v1 import subscription as subscription_api
+from app.core.auth_cache import auth_cache
+from app.main import app
+from app.models.subscription import Subscription
+from app.models.user import User
+from app.services.session import create_or_update_session
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "diner@example.com"
+
+
+@pytest.fixture
+async def client(mongo, monkeypatch):
+    monkeypatch.setattr(subscription_api.stripe.Subscription, "delete", lambda subscription_id: None)
+    auth_cache.clear()
+    await User(email=EMAIL, subscription_status="active").insert()
+    await Subscription(
+        user_email=EMAIL, stripe_customer_id="cus_1", stripe_subscription_id="sub_1",
+        status="active", start_date=datetime.now(timezone.utc),
+    ).insert()
+    session = await create_or_update_session(EMAIL)
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        yield client
+
+
+async def test_cancel_keeps_fields_changed_behind_the_auth_cache(client):
+    assert (await client.get("/api/v1/users/me")).status_code == 200  # caches the user
+    # Saved by a request to another worker, whose cache invalidation never reaches this one
+    await User.find_one(User.email == EMAIL).update({"$set": {"name": "Ada"}})
+
+    assert (await client.post("/api/v1/subscription/cancel")).status_code == 200
+
+    user = await User.find_one(User.email == EMAIL)
+    assert user.subscription_status == "cancelled" and user.subscription_end_date is not None
+    assert user.name == "Ada"
@@ -0,0 +1,17 @@
+import numpy as np
+
+from app.services.matchmaking import constraints, v2
+from app.services.matchmaking.constraints import GroupConstraints, GroupFeatures
+
+
+def test_features_without_limits_are_never_evaluated(monkeypatch):
+    rng = np.random.default_rng(0)
+    traits = rng.random((60, 5))
+    features = GroupFeatures(GroupConstraints(), rng.integers(0, 2, 60), rng.uniform(20, 60, 60))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("swap_cost evaluated without any limit set")
+
+    monkeypatch.setattr(constraints.GroupFeatures, "swap_cost", fail)
+    groups = v2.match_traits_into_groups(traits, seed=1, group_features=features)
+    assert groups == v2.match_traits_into_groups(traits, seed=1)
@@ -0,0 +1,33 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from app.services.venue_assignment import INFEASIBLE_COST, solve_assignment
+
+
+def brute_force(cost: np.ndarray) -> float:
+    rows, columns = cost.shape
+    return min(
+        sum(cost[row, column] for row, column in enumerate(chosen))
+        for chosen in permutations(range(columns), rows)
+    )
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_solve_assignment_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    rows = int(rng.integers(1, 7))
+    columns = int(rng.integers(rows, 8))
+    if seed % 2:
+        cost = rng.random((rows, columns))
+    else:
+        # Small integers tie often, and some pairs don't fit at all, as with real venues
+        cost = rng.integers(0, 4, (rows, columns)).astype(float)
+        cost[rng.random((rows, columns)) < 0.2] = INFEASIBLE_COST
+
+    assignment = solve_assignment(cost)
+
+    assert len(assignment) == rows and len(set(assignment)) == rows
+    assert all(0 <= column < columns for column in assignment)
+    assert sum(cost[row, column] for row, column in enumerate(assignment)) == pytest.approx(brute_force(cost))